@@ -1,19 +1,274 @@
 import sys
-from collections import deque
-from queue import PriorityQueue
+import os
+import hashlib
+import mmap
+import struct
+import json
+import time
+import tracemalloc
+from array import array
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from functools import cached_property
+from heapq import heappush, heappop
 
-def load_transitions(filename): #ucitavanje prijelaza izmedu stanja iz datoteke
+class Graph: #kompaktni graf: stanja kao cijeli brojevi, prijelazi u CSR poljima
+    def __init__(self, names, offsets, targets, costs, order):
+        self.names = names #ime stanja za svaki indeks (abecedno, pa su izjednacenja u redu ista kao kod imena)
+        self.offsets = offsets #prijelazi stanja i su targets[offsets[i]:offsets[i + 1]]
+        self.targets = targets #sljedeca stanja
+        self.costs = costs #troskovi prijelaza
+        self.order = order #stanja redoslijedom kojim su zadana u datoteci
+
+    @cached_property
+    def index(self): #indeks za svako ime stanja, gradi se tek kad zatreba
+        return {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self):
+        return len(self.names)
+
+    def successors(self, state): #prijelazi iz stanja kao parovi (sljedece_stanje, trosak)
+        begin, end = self.offsets[state], self.offsets[state + 1]
+        return zip(self.targets[begin:end], self.costs[begin:end])
+
+    def table(self, fill, typecode='d'): #polje s vrijednoscu za svako stanje
+        return array(typecode, [fill]) * len(self.names)
+
+    def label(self, state): #ime stanja za ispis
+        return self.names[state]
+
+    def reversed(self): #obrnuti graf (sljedece_stanje -> prethodna stanja)
+        offsets = array('q', [0]) * (len(self.names) + 1)
+        for target in self.targets: #broj ulaznih prijelaza za svako stanje
+            offsets[target + 1] += 1
+        for i in range(len(self.names)):
+            offsets[i + 1] += offsets[i]
+        fill = array('q', offsets[:-1]) #sljedece slobodno mjesto za svako stanje
+        targets = array('q', [0]) * len(self.targets)
+        costs = array('q', [0]) * len(self.costs)
+        for state in range(len(self.names)):
+            for edge in range(self.offsets[state], self.offsets[state + 1]):
+                target = self.targets[edge]
+                targets[fill[target]] = state
+                costs[fill[target]] = self.costs[edge]
+                fill[target] += 1
+        return Graph(self.names, offsets, targets, costs, self.order)
+
+class _Table(dict): #rijetka tablica vrijednosti po stanju za implicitne prostore stanja
+    def __init__(self, fill):
+        self.fill = fill #vrijednost za stanja koja jos nisu zapisana
+
+    def __missing__(self, state):
+        return self.fill
+
+class PuzzleSpace: #implicitni prostor stanja slagalice n x n, ploce su pakirani cijeli brojevi
+    SYMBOLS = "123456789abcdef" #oznake plocica, prazno polje je x
+    BLANK = 15 #kod praznog polja, veci od svih plocica kao sto je x veci od svih oznaka
+
+    def __init__(self, size):
+        self.size = size
+        self.cells = range(size * size)
+        #polje i zauzima 4 bita, prvo polje je najznacajnije pa je poredak brojeva jednak poretku oznaka ploca
+        #najniza 4 bita cuvaju polozaj praznog polja
+        self.offsets = [4 * (size * size - i) for i in self.cells]
+        self.moves = [] #susjedna polja za svaki polozaj praznog polja
+        for cell in self.cells:
+            row, col = divmod(cell, size)
+            self.moves.append([r * size + c for r, c in ((row - 1, col), (row, col - 1), (row, col + 1), (row + 1, col)) if 0 <= r < size and 0 <= c < size])
+
+    @classmethod
+    def from_board(cls, text): #prostor stanja velicine zadane ploce
+        return cls(len(text.split("_")))
+
+    def encode(self, text): #ploca oblika 123_456_78x u pakirani cijeli broj
+        cells = text.replace("_", "")
+        if len(cells) != self.size * self.size or sorted(cells) != sorted(self.SYMBOLS[:len(cells) - 1] + "x"):
+            raise ValueError(f"neispravna ploca: {text}")
+        state = 0
+        for cell, symbol in enumerate(cells):
+            code = self.BLANK if symbol == "x" else self.SYMBOLS.index(symbol)
+            state |= code << self.offsets[cell]
+            if code == self.BLANK:
+                state |= cell
+        return state
+
+    def tiles(self, state): #kodovi polja redom po polozaju
+        return [(state >> offset) & 15 for offset in self.offsets]
+
+    def label(self, state): #ploca za ispis
+        cells = "".join("x" if code == self.BLANK else self.SYMBOLS[code] for code in self.tiles(state))
+        return "_".join(cells[i:i + self.size] for i in range(0, len(cells), self.size))
+
+    def default_goal(self): #slozena ploca s praznim poljem na kraju
+        cells = self.SYMBOLS[:self.size * self.size - 1] + "x"
+        return self.encode("_".join(cells[i:i + self.size] for i in range(0, len(cells), self.size)))
+
+    def successors(self, state): #prijelazi pomicanjem plocice u prazno polje, svaki s troskom 1
+        blank = state & 15
+        blank_offset = self.offsets[blank]
+        result = []
+        for cell in self.moves[blank]:
+            offset = self.offsets[cell]
+            code = (state >> offset) & 15
+            result.append((state + ((code - self.BLANK) << blank_offset) + ((self.BLANK - code) << offset) + cell - blank, 1))
+        return result
+
+    def table(self, fill, typecode='d'): #vrijednosti se pamte samo za dotaknuta stanja
+        return _Table(fill)
+
+    def parity(self, state): #invarijanta koju potezi ne mijenjaju
+        tiles = [code for code in self.tiles(state) if code != self.BLANK]
+        inversions = sum(1 for i in range(len(tiles)) for j in range(i + 1, len(tiles)) if tiles[i] > tiles[j])
+        if self.size % 2: #neparna sirina: samo parnost inverzija
+            return inversions % 2
+        return (inversions + (state & 15) // self.size) % 2 #parna sirina: i redak praznog polja
+
+    def solvable(self, start, goal): #postoji li put od pocetne do ciljne ploce
+        return self.parity(start) == self.parity(goal)
+
+class ManhattanHeuristic: #zbroj manhattanskih udaljenosti plocica od ciljnih polja
+    def __init__(self, space, goal):
+        self.offsets = space.offsets
+        target = {code: cell for cell, code in enumerate(space.tiles(goal))}
+        self.distance = [0] * (16 * space.size * space.size) #udaljenost za (polje, kod plocice), 0 za prazno polje
+        for cell in space.cells:
+            for code in range(space.size * space.size - 1):
+                self.distance[(cell << 4) | code] = abs(cell // space.size - target[code] // space.size) + abs(cell % space.size - target[code] % space.size)
+
+    def __getitem__(self, state):
+        distance = self.distance
+        return sum(distance[(cell << 4) | ((state >> offset) & 15)] for cell, offset in enumerate(self.offsets))
+
+class MisplacedHeuristic: #broj plocica koje nisu na ciljnom polju
+    def __init__(self, space, goal):
+        self.space = space
+        self.goal = space.tiles(goal)
+
+    def __getitem__(self, state):
+        return sum(1 for code, goal_code in zip(self.space.tiles(state), self.goal) if code != goal_code and code != self.space.BLANK)
+
+PUZZLE_HEURISTICS = {"manhattan": ManhattanHeuristic, "misplaced": MisplacedHeuristic}
+
+class Frontier: #prioritetni red nad heapq bez zakljucavanja, zastarjeli unosi se preskacu pri vadenju
+    def __init__(self):
+        self.heap = [] #unosi (prioritet, stanje, trosak)
+        self.stale = 0 #broj preskocenih zastarjelih unosa (usteda ponovnih sirenja)
+        self.peak = 0 #najveca duljina reda
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, priority, state, cost): #dodavanje stanja s prioritetom i troskom do stanja
+        heappush(self.heap, (priority, state, cost))
+        if len(self.heap) > self.peak:
+            self.peak = len(self.heap)
+
+    def peek(self, cost): #najmanji prioritet aktualnog unosa, beskonacan ako je red prazan
+        heap = self.heap
+        while heap and heap[0][2] > cost[heap[0][1]]: #zastarjeli unosi s vrha
+            heappop(heap)
+            self.stale += 1
+        return heap[0][0] if heap else float('inf')
+
+    def pop(self, cost): #stanje s najmanjim prioritetom ciji je trosak jos aktualan, ili None
+        heap = self.heap
+        while heap:
+            _, state, state_cost = heappop(heap)
+            if state_cost > cost[state]: #u meduvremenu je pronaden jeftiniji put do stanja
+                self.stale += 1
+                continue
+            return state, state_cost
+        return None
+
+class SearchStats: #mjerenja pretrage, jednako definirana za sve algoritme
+    def __init__(self, alg=None):
+        self.alg = alg
+        self.expanded = 0 #broj prosirenih stanja (ukljucujuci ponovna sirenja)
+        self.generated = 0 #broj generiranih prijelaza
+        self.reopened = 0 #broj ponovnih otvaranja vec otvorenih ili prosirenih stanja
+        self.stale = 0 #broj preskocenih zastarjelih unosa u prioritetnom redu
+        self.peak_frontier = 0 #najveca duljina reda (za IDA* najveca dubina stoga)
+        self.times = {} #trajanje faza u sekundama
+        self._phases = [] #aktivne faze [ime, pocetak], unutarnja faza ne ulazi u vanjsku
+
+    @contextmanager
+    def phase(self, name): #mjerenje trajanja faze (parse, search, path)
+        now = time.perf_counter()
+        if self._phases: #vanjska faza se pauzira
+            outer = self._phases[-1]
+            self.times[outer[0]] = self.times.get(outer[0], 0.0) + now - outer[1]
+        self._phases.append([name, now])
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.times[name] = self.times.get(name, 0.0) + end - self._phases.pop()[1]
+            if self._phases: #nastavak vanjske faze
+                self._phases[-1][1] = end
+
+    def add_frontier(self, frontier, stale_before=0): #podaci iz prioritetnog reda
+        self.stale += frontier.stale - stale_before
+        self.peak_frontier = max(self.peak_frontier, frontier.peak)
+
+    def to_json(self): #mjerenja kao jedan JSON redak
+        search_time = self.times.get("search", 0.0)
+        return json.dumps({
+            "algorithm": self.alg,
+            "expanded": self.expanded,
+            "generated": self.generated,
+            "reopened": self.reopened,
+            "stale_skipped": self.stale,
+            "peak_frontier": self.peak_frontier,
+            "peak_memory_bytes": tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None,
+            "expansions_per_sec": round(self.expanded / search_time) if search_time else None,
+            "time": {name: round(seconds, 6) for name, seconds in self.times.items()},
+        })
+
+class _Ids(dict): #rjecnik koji novom imenu stanja dodjeljuje sljedeci slobodni indeks
+    def __missing__(self, name):
+        self[name] = len(self)
+        return self[name]
+
+def load_graph(filename, use_cache=True): #ucitavanje prijelaza izravno u kompaktni graf
+    cached = read_graph_cache(filename) if use_cache else None
+    if cached is not None: #prevedena datoteka je aktualna
+        return cached
     with open(filename, 'r') as file:
-        lines = [line.strip() for line in file.readlines() if not line.startswith('#') and line.strip()]
-    start = lines[0] #pocetno stanje
-    goal = lines[1].split(" ") #lista ciljnih stanja
-    transitions = {}
-    for line in lines[2:]:
-        state, lista = line.split(":")[0], line.split(":")[1].strip()
-        transitions[state] = [(part.split(',')[0], int(part.split(',')[1])) for part in lista.split()] #prijelazi kao tuple (sljedece_stanje, trosak)
-    return start, goal, transitions
-
-def load_heuristics(filename): #ucitavanje heuristickih vrijednosti iz datoteke
+        lines = (line.strip() for line in file if not line.startswith('#') and line.strip())
+        start = next(lines) #pocetno stanje
+        goal = next(lines).split(" ") #lista ciljnih stanja
+        ids = _Ids() #privremeni indeks stanja redom pojavljivanja
+        rows = {} #redak prijelaza za svako stanje (zadnji redak vrijedi)
+        ends, targets, costs = array('q', [0]), array('q'), array('q') #granice redaka, sljedeca stanja, troskovi
+        for line in lines:
+            state, _, lista = line.partition(":")
+            edges = lista.replace(',', ' ').split() #naizmjence sljedece stanje i trosak
+            targets.extend(map(ids.__getitem__, edges[0::2]))
+            costs.extend(map(int, edges[1::2]))
+            rows[ids[state]] = len(ends) - 1
+            ends.append(len(targets))
+    for state in [start] + goal:
+        ids[state]
+    names = list(ids)
+    perm = sorted(range(len(names)), key=names.__getitem__) #konacni indeksi abecedno po imenu stanja
+    rank = array('q', [0]) * len(names) #privremeni indeks -> konacni indeks
+    for i, state in enumerate(perm):
+        rank[state] = i
+    targets = array('q', map(rank.__getitem__, targets))
+    offsets, new_targets, new_costs = array('q', [0]), array('q'), array('q')
+    for state in perm: #retci prijelaza poredani po konacnom indeksu stanja
+        row = rows.get(state)
+        if row is not None:
+            new_targets += targets[ends[row]:ends[row + 1]]
+            new_costs += costs[ends[row]:ends[row + 1]]
+        offsets.append(len(new_targets))
+    graph = Graph([names[state] for state in perm], offsets, new_targets, new_costs, array('q', map(rank.__getitem__, rows)))
+    return graph.index[start], [graph.index[state] for state in goal], graph
+
+def load_heuristics(filename, use_cache=True): #ucitavanje heuristickih vrijednosti iz datoteke
+    cached = read_heuristics_cache(filename) if use_cache else None
+    if cached is not None: #prevedena datoteka je aktualna
+        return cached
     heuristics = {}
     with open(filename, 'r') as file:
         for line in file:
@@ -21,6 +276,109 @@ def load_heuristics(filename): #ucitavanje heuristickih vrijednosti iz datoteke
             heuristics[parts[0].strip()] = int(parts[1].strip())
     return heuristics
 
+CACHE_VERSION = 1
+GRAPH_HEADER = struct.Struct('<4sIqq16sqqqqq') #oznaka, verzija, mtime, velicina i sazetak izvora, broj stanja, prijelaza, redaka, ciljeva, pocetno stanje
+HEURISTICS_HEADER = struct.Struct('<4sIqq16sq') #oznaka, verzija, mtime, velicina i sazetak izvora, broj stanja
+
+def source_fingerprint(filename): #mtime, velicina i sazetak izvorne datoteke
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filename, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    stat = os.stat(filename)
+    return stat.st_mtime_ns, stat.st_size, digest.digest()
+
+def open_cache(filename, header, magic): #mapiranje prevedene datoteke ako odgovara izvoru, inace None
+    path = filename + ".bin"
+    if not os.path.exists(path) or not os.path.exists(filename) or os.path.getsize(path) < header.size: #prazna ili odrezana datoteka
+        return None
+    with open(path, 'rb') as file:
+        view = memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+    fields = header.unpack_from(view)
+    if fields[0] != magic or fields[1] != CACHE_VERSION:
+        return None
+    stat = os.stat(filename)
+    if (fields[2], fields[3]) != (stat.st_mtime_ns, stat.st_size) or fields[:5] != (magic, CACHE_VERSION) + source_fingerprint(filename):
+        return None #izvor je promijenjen nakon prevodenja
+    return view, fields
+
+def write_cache(filename, header, fields, arrays, names): #zaglavlje, polja cijelih brojeva i tablica imena stanja
+    #pise se u privremenu datoteku koja tek potpuna zamjenjuje staru, pa prekinuto pisanje ne ostavlja nepotpuni filename.bin
+    blob = "\n".join(names).encode()
+    temporary = f"{filename}.bin.{os.getpid()}.tmp"
+    try:
+        with open(temporary, 'wb') as file:
+            file.write(header.pack(*fields))
+            for values in arrays:
+                file.write(values.tobytes())
+            file.write(struct.pack('<q', len(blob)))
+            file.write(blob)
+        os.replace(temporary, filename + ".bin")
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+def read_sections(view, offset, counts, states): #polja cijelih brojeva i tablica imena iza zaglavlja, None ako velicina ne odgovara zaglavlju
+    end = offset + 8 * sum(counts)
+    if min(counts) < 0 or len(view) < end + 8:
+        return None
+    size, = struct.unpack_from('<q', view, end)
+    if end + 8 + size != len(view):
+        return None
+    arrays = []
+    for count in counts:
+        arrays.append(view[offset:offset + 8 * count].cast('q'))
+        offset += 8 * count
+    names = bytes(view[end + 8:]).decode().split("\n") if states else []
+    if len(names) != states:
+        return None
+    return arrays, names
+
+def compile_graph(filename): #prijelazi u binarnu datoteku filename.bin
+    start, goal, graph = load_graph(filename, use_cache=False)
+    fields = (b"UUIG", CACHE_VERSION) + source_fingerprint(filename) + (len(graph), len(graph.targets), len(graph.order), len(goal), start)
+    write_cache(filename, GRAPH_HEADER, fields, [graph.offsets, graph.targets, graph.costs, graph.order, array('q', goal)], graph.names)
+
+def read_graph_cache(filename): #graf iz aktualne binarne datoteke, polja se citaju izravno iz mapirane memorije
+    opened = open_cache(filename, GRAPH_HEADER, b"UUIG")
+    if opened is None:
+        return None
+    view, (_, _, _, _, _, states, edges, rows, goals, start) = opened
+    sections = read_sections(view, GRAPH_HEADER.size, (states + 1, edges, edges, rows, goals), states)
+    if sections is None: #odrezana ili ostecena datoteka, graf se cita iz izvora
+        return None
+    (offsets, targets, costs, order, goal), names = sections
+    return start, list(goal), Graph(names, offsets, targets, costs, order)
+
+def compile_heuristics(filename): #heuristicke vrijednosti u binarnu datoteku filename.bin
+    heuristics = load_heuristics(filename, use_cache=False)
+    fields = (b"UUIH", CACHE_VERSION) + source_fingerprint(filename) + (len(heuristics),)
+    write_cache(filename, HEURISTICS_HEADER, fields, [array('q', heuristics.values())], heuristics)
+
+def read_heuristics_cache(filename): #heuristike iz aktualne binarne datoteke
+    opened = open_cache(filename, HEURISTICS_HEADER, b"UUIH")
+    if opened is None:
+        return None
+    view, (_, _, _, _, _, states) = opened
+    sections = read_sections(view, HEURISTICS_HEADER.size, (states,), states)
+    if sections is None:
+        return None
+    (values,), names = sections
+    return dict(zip(names, values))
+
+def heuristic_table(graph, heuristics): #heuristicke vrijednosti kao polje po indeksu stanja
+    h = graph.table(0.0)
+    for state, value in heuristics.items():
+        if state in graph.index:
+            h[graph.index[state]] = value
+    return h
+
+def goal_table(graph, goal): #oznaka ciljnog stanja za svako stanje
+    is_goal = graph.table(0, 'b')
+    for state in goal:
+        is_goal[state] = 1
+    return is_goal
+
 def short_path(came_from, start, goal): #konstrukcija putanje od pocetnog do ciljnog stanja
     current, path = goal, []
     while current != start: #od cilja prema startu
@@ -31,108 +389,374 @@ def short_path(came_from, start, goal): #konstrukcija putanje od pocetnog do cil
     return path
 
 def print_output(alg, path, visited, filename, total_cost=None): #ispis rezultata algoritama
-    if alg == "A*":
-        print(f"# A-STAR {filename}")
+    if alg.endswith("*"): #A* i IDA* ispisuju i heuristiku
+        print(f"# {alg[:-1]}-STAR {filename}")
     else:
         print(f"# {alg}")
     print("[FOUND_SOLUTION]: yes")
-    print("[STATES_VISITED]:", len(visited))
+    print("[STATES_VISITED]:", visited)
     print("[PATH_LENGTH]:", len(path))
     if total_cost is not None:
         print("[TOTAL_COST]:", total_cost)
     print("[PATH]:", " => ".join(path))
 
-def bfs(filename): #algoritam pretrage u sirinu
-    start, goal, transitions = load_transitions(filename) #pocetno stanje, ciljevi i prijelazi iz datoteke
+def print_no_solution(alg): #ispis ako algoritam nije pronasao putanju
+    print(f"# {alg[:-1] + '-STAR' if alg.endswith('*') else alg}\n[FOUND_SOLUTION]: no")
+
+def bfs_search(space, start, goal, stats=None): #pretraga u sirinu, vraca (putanja, broj posjecenih, trosak) ili None
+    stats = SearchStats() if stats is None else stats
     deq = deque([(start, 0)]) #stog s pocetnim stanjem i pocetnim troskom 0
-    came_from = {start: None} #putanje do stanja
-    cost = {start: 0} #trosak do stanja
-    visited = set([start]) #skup posjecenih stanja
+    came_from = space.table(-1, 'q') #putanje do stanja
+    cost = space.table(float('inf')) #trosak do stanja, beskonacan za neposjecena stanja
+    cost[start], inf = 0, float('inf')
+    visited, expanded, generated, reopened, peak = 1, 0, 0, 0, 1 #broj posjecenih stanja, mjerenja
 
     while deq:
         current, current_cost = deq.popleft() #prvi element sa stoga
 
-        if current in goal: #trenutno stanje je ciljno stanja
-            path = short_path(came_from, start, current) #putanja
-            print_output("BFS", path, visited, filename, current_cost) #ispis rezultata
-            return #gotova funkcija
+        if goal[current]: #trenutno stanje je ciljno stanja
+            break
 
-        for next, next_cost in transitions[current]: #svi moguci prijelazi iz stanja
+        expanded += 1
+        for next, next_cost in space.successors(current): #svi moguci prijelazi iz stanja
+            generated += 1
             new_cost = current_cost + next_cost #novi trosak
-            if next not in visited or new_cost < cost.get(next, float('inf')): #sljedece stanje nije posjeceno ili pronaden jeftiniji put
+            if new_cost < cost[next]: #sljedece stanje nije posjeceno ili pronaden jeftiniji put
                 deq.append((next, new_cost)) #dodajemo stanje na stog
                 came_from[next] = current #pamtimo prethodno stanje
+                if cost[next] == inf: #sljedece stanje dodajemo u posjeceno
+                    visited += 1
+                else:
+                    reopened += 1
                 cost[next] = new_cost #azuriranje troska
-                visited.add(next)  #sljedece stanje dodajemo u posjeceno
-
-    print("# BFS\n[FOUND_SOLUTION]: no") #ako algoritam nije pronasao putanju
-
-def ucs(filename): #algoritam uniformne troskovne pretrage
-    start, goal, transitions = load_transitions(filename) #pocetno stanje, ciljevi i prijelazi iz datoteke
-    pq, came_from, cost, visited = PriorityQueue(), {start: None}, {start: 0.0}, set()  #prioritetni red, putanje do stanja, trosak, posjecena stanja
-    pq.put((0.0, start))  #pocetno stanje s troskom 0
-    while not pq.empty(): #dok prioritetni red nije prazan
-        current_cost, current = pq.get() 
-        if current in goal: #ako je trenutno stanje ciljno
-            print_output("UCS", short_path(came_from, start, current), visited, filename, f"{cost[current]:.1f}") #ispis rezultata algoritma
-            return #kraj funkcije
-        visited.add(current) #trenutno stanje kao posjeceno
-        for next, next_cost in transitions[current]: #za svaki prijelaz iz stanja
-            new_cost = current_cost + float(next_cost)  #novi trosak
-            if next not in cost or new_cost < cost[next]: #ako nije odabrano sljedece stanje ili postoji jeftiniji put
-                pq.put((new_cost, next)) #novo stanje u prioritetni red
-                came_from[next] = current #pamti prethodno stanje
-                cost[next] = new_cost #azurira trosak
-    print("# UCS\n[FOUND_SOLUTION]: no") #ako putanja nije pronadena
+        if len(deq) > peak:
+            peak = len(deq)
+    else:
+        current = None
+    stats.expanded += expanded
+    stats.generated += generated
+    stats.reopened += reopened
+    stats.peak_frontier = max(stats.peak_frontier, peak)
+    if current is None: #red je prazan, cilj nije dohvatljiv
+        return None
+    with stats.phase("path"):
+        return short_path(came_from, start, current), visited, current_cost
+
+class ShortestPathTree: #Dijkstra iz jednog izvora koji se nastavlja po potrebi, za vise upita iz istog stanja
+    def __init__(self, space, start):
+        self.space, self.start = space, start
+        self.frontier = Frontier() #prioritetni red
+        self.came_from = space.table(-1, 'q') #putanje do stanja
+        self.cost = space.table(float('inf')) #trosak do stanja
+        self.rank = space.table(-1, 'q') #broj stanja obradenih prije stanja, -1 za neobradena stanja
+        self.count = 0 #broj obradenih stanja
+        self.cost[start] = 0.0
+        self.frontier.push(0.0, start, 0.0) #pocetno stanje s troskom 0
 
+    def search(self, goal, stats=None): #nastavlja pretragu do prvog obradenog ciljnog stanja, vraca (putanja, broj posjecenih, trosak) ili None
+        stats = SearchStats() if stats is None else stats
+        frontier, came_from, cost, rank = self.frontier, self.came_from, self.cost, self.rank
+        count, generated, stale = self.count, 0, frontier.stale
+        while True:
+            entry = frontier.pop(cost)
+            if entry is None: #prioritetni red je prazan
+                current = None
+                break
+            current, current_cost = entry
+            rank[current] = count #trenutno stanje kao posjeceno
+            count += 1
+            for next, next_cost in self.space.successors(current): #za svaki prijelaz iz stanja
+                generated += 1
+                new_cost = current_cost + next_cost  #novi trosak
+                if new_cost < cost[next]: #ako nije odabrano sljedece stanje ili postoji jeftiniji put
+                    frontier.push(new_cost, next, new_cost) #novo stanje u prioritetni red
+                    came_from[next] = current #pamti prethodno stanje
+                    cost[next] = new_cost #azurira trosak
+            if goal[current]: #ako je trenutno stanje ciljno
+                break
+        stats.expanded += count - self.count
+        stats.generated += generated
+        stats.add_frontier(frontier, stale)
+        self.count = count
+        if current is None:
+            return None
+        with stats.phase("path"):
+            return short_path(came_from, self.start, current), rank[current], cost[current]
 
-def astar(filename, heuristic_file): #A* algoritam pretrage
-    start, goal, transitions = load_transitions(filename) #pocetno stanje, ciljevi i prijelazi iz datoteke
-    heuristics = load_heuristics(heuristic_file) #heuristicke vrijednosti za svako stanje iz datoteke
-    pq, came_from, cost, visited = PriorityQueue(), {start: None}, {start: 0.0}, set()  #prioritetni red, putanje do stanja, trosak, posjecena stanja
-    pq.put((heuristics[start], start, 0.0)) #pocetno stanje u prioritetni red 
+    def query(self, goal_states, stats=None): #odgovor iz vec izgradenog stabla ili nastavak pretrage, isti kao kod nove pretrage
+        settled = [state for state in goal_states if self.rank[state] >= 0]
+        if settled: #prvi obradeni cilj je onaj na kojem bi nova pretraga stala
+            state = min(settled, key=self.rank.__getitem__)
+            with (SearchStats() if stats is None else stats).phase("path"):
+                return short_path(self.came_from, self.start, state), self.rank[state], self.cost[state]
+        is_goal = _Table(0)
+        for state in goal_states:
+            is_goal[state] = 1
+        return self.search(is_goal, stats)
 
-    while not pq.empty(): #prioritetni red nije prazan
-        _, current, current_cost = pq.get() #stanje iz prioritetnog reda
+def ucs_search(space, start, goal, stats=None): #uniformna troskovna pretraga, vraca (putanja, broj posjecenih, trosak) ili None
+    return ShortestPathTree(space, start).search(goal, stats)
 
-        if current in goal: #trenutno je ciljno stanje
-            print_output("A*", short_path(came_from, start, current), visited, heuristic_file, f"{cost[current]:.1f}") #ispis rezultata algoritma
-            return #povratak iz funkcije
+def astar_search(space, start, goal, h, stats=None): #A* pretraga, vraca (putanja, broj posjecenih, trosak) ili None
+    stats = SearchStats() if stats is None else stats
+    frontier = Frontier() #prioritetni red
+    came_from, cost, visited = space.table(-1, 'q'), space.table(float('inf')), space.table(0, 'b') #putanje do stanja, trosak, posjecena stanja
+    cost[start], count = 0.0, 0 #pocetni trosak, broj posjecenih stanja
+    expanded, generated, reopened = 0, 0, 0 #mjerenja
+    frontier.push(h[start], start, 0.0) #pocetno stanje u prioritetni red
 
-        visited.add(current) #trenutno stanje posjeceno
-        for next, next_cost in transitions[current]: #za svaki prijelaz iz trenutnog stanja
-            new_cost = current_cost + float(next_cost)  #novi trosak
-            if next not in cost or new_cost < cost[next]: #sljedece stanje nije obradeno ili pronaden jeftiniji put
-                total_cost = new_cost + heuristics[next] #ukupni trosak
-                pq.put((total_cost, next, new_cost))  #dodavanje novog stanja u prioritetni red
+    while True:
+        entry = frontier.pop(cost) #stanje iz prioritetnog reda
+        if entry is None: #prioritetni red je prazan
+            current = None
+            break
+        current, current_cost = entry
+
+        if goal[current]: #trenutno je ciljno stanje
+            break
+
+        expanded += 1
+        if not visited[current]: #trenutno stanje posjeceno
+            visited[current] = 1
+            count += 1
+        else: #stanje je ponovno otvoreno jer je pronaden jeftiniji put
+            reopened += 1
+        for next, next_cost in space.successors(current): #za svaki prijelaz iz trenutnog stanja
+            generated += 1
+            new_cost = current_cost + next_cost  #novi trosak
+            if new_cost < cost[next]: #sljedece stanje nije obradeno ili pronaden jeftiniji put
+                frontier.push(new_cost + h[next], next, new_cost)  #dodavanje novog stanja u prioritetni red s ukupnim troskom
                 came_from[next] = current #pamti prethodno stanje
                 cost[next] = new_cost #azurira trosak
+    stats.expanded += expanded
+    stats.generated += generated
+    stats.reopened += reopened
+    stats.add_frontier(frontier)
+    if current is None:
+        return None
+    with stats.phase("path"):
+        return short_path(came_from, start, current), count, current_cost
 
-    print("# A-STAR\n[FOUND_SOLUTION]: no") #ako putanja nije pronadena
+def idastar_search(space, start, goal, h, stats=None): #IDA* s memorijom linearnom u duljini putanje, vraca (putanja, broj sirenja, trosak) ili None
+    stats = SearchStats() if stats is None else stats
+    if goal[start]: #pocetno stanje je ciljno
+        return [start], 0, 0.0
+    bound, count, generated = h[start], 0, 0 #granica f = g + h, broj sirenja u svim iteracijama, broj generiranih prijelaza
+    result = None
+    while result is None:
+        path, costs, on_path = [start], [0.0], {start} #trenutna putanja, troskovi do stanja na putanji
+        stack = [iter(space.successors(start))] #neobradeni prijelazi za svako stanje na putanji
+        previous, count = count, count + 1 #sirenja prije ove iteracije se ponavljaju
+        next_bound = float('inf') #najmanji f koji je premasio granicu
+        while stack and result is None:
+            for next, next_cost in stack[-1]: #sljedeci prijelaz iz zadnjeg stanja na putanji
+                generated += 1
+                if next in on_path: #bez ciklusa na trenutnoj putanji
+                    continue
+                new_cost = costs[-1] + next_cost
+                f = new_cost + h[next]
+                if f > bound: #stanje izvan granice, pamti najmanje prekoracenje
+                    next_bound = min(next_bound, f)
+                    continue
+                if goal[next]: #pronaden cilj unutar granice
+                    path.append(next)
+                    result = path, count, new_cost
+                    break
+                path.append(next) #spustanje u sljedece stanje
+                costs.append(new_cost)
+                on_path.add(next)
+                stack.append(iter(space.successors(next)))
+                stats.peak_frontier = max(stats.peak_frontier, len(stack))
+                count += 1
+                break
+            else: #svi prijelazi zadnjeg stanja su obradeni, povratak
+                stack.pop()
+                on_path.discard(path.pop())
+                costs.pop()
+        if result is None and next_bound == float('inf'): #nijedno stanje nije premasilo granicu, cilj nije dohvatljiv
+            break
+        bound = next_bound
+    stats.expanded += count
+    stats.generated += generated
+    stats.reopened += previous
+    return result
 
-def calculate_cost(state, goal,transitions): #trosak stanja do cilja koristeci UCS algoritam
-    pq, came_from, cost, visited = PriorityQueue(), {state: None}, {state: 0.0}, set()   #prioritetni red, putanje do stanja, trosak, posjecena stanja
-    pq.put((0.0, state))  #pocetno stanje u prioritetni red
-    while not pq.empty(): #dok prioritetni red nije prazan
-        current_cost, current = pq.get() #stanje s najmanjim troskom
-        if current in goal: #trenutno stanje je ciljno
-            return current_cost #vraca trosak
-        visited.add(current) #trenutno stanje kao posjeceno
-        for next, next_cost in transitions[current]: #prijelazi iz trenutnog stanja
-            new_cost = current_cost + float(next_cost)  #novi trosak do sljedeceg stanja
-            if next not in cost or new_cost < cost[next]: #sljedece stanje nije posjeceno ili ima jeftiniji put
-                pq.put((new_cost, next)) #sljedece stanje u prioritetni red
-                came_from[next] = current #dodavanje prethodnog stanja
-                cost[next] = new_cost #azurira trosak do stanja
+def bidirectional_search(space, reverse, start, goal, goal_states, stats=None): #dvosmjerni Dijkstra, vraca (putanja, broj posjecenih, trosak) ili None
+    stats = SearchStats() if stats is None else stats
+    if goal[start]: #pocetno stanje je ciljno
+        return [start], 0, 0.0
+    inf = float('inf')
+    sides = [] #(prostor, prioritetni red, trosak, prethodnik, posjeceno) za smjer unaprijed i unatrag
+    for side_space, sources in ((space, [start]), (reverse, goal_states)):
+        frontier, cost = Frontier(), side_space.table(inf)
+        for state in sources:
+            cost[state] = 0.0
+            frontier.push(0.0, state, 0.0)
+        sides.append((side_space, frontier, cost, side_space.table(-1, 'q'), side_space.table(0, 'b')))
+    best, meet, count = inf, None, 0 #najkraci pronadeni put, stanje susreta, broj posjecenih
+    expanded, generated, peak = 0, 0, 0 #mjerenja
+    while True:
+        top = [frontier.peek(cost) for _, frontier, cost, _, _ in sides]
+        if top[0] + top[1] >= best: #nijedan neobradeni put ne moze biti kraci od najboljeg (ili je neki red prazan)
+            break
+        side = 0 if len(sides[0][1]) <= len(sides[1][1]) else 1 #sirimo smjer s manjim redom
+        side_space, frontier, cost, came_from, visited = sides[side]
+        other_cost = sides[1 - side][2]
+        current, current_cost = frontier.pop(cost)
+        expanded += 1
+        if not visited[current]:
+            visited[current] = 1
+            count += 1
+        for next, next_cost in side_space.successors(current): #prijelazi (unatrag: prethodna stanja)
+            generated += 1
+            new_cost = current_cost + next_cost
+            if new_cost < cost[next]:
+                frontier.push(new_cost, next, new_cost)
+                came_from[next] = current
+                cost[next] = new_cost
+                if new_cost + other_cost[next] < best: #putevi iz oba smjera se spajaju u sljedecem stanju
+                    best, meet = new_cost + other_cost[next], next
+        peak = max(peak, len(sides[0][1]) + len(sides[1][1]))
+    stats.expanded += expanded
+    stats.generated += generated
+    stats.stale += sides[0][1].stale + sides[1][1].stale
+    stats.peak_frontier = max(stats.peak_frontier, peak)
+    if meet is None: #smjerovi se nisu susreli
+        return None
+    with stats.phase("path"):
+        path = short_path(sides[0][3], start, meet) #od pocetka do susreta
+        current = meet
+        while sides[1][3][current] != -1: #od susreta prema cilju
+            current = sides[1][3][current]
+            path.append(current)
+    return path, count, best
+
+ALGORITHMS = {"bfs": "BFS", "ucs": "UCS", "astar": "A*", "idastar": "IDA*", "bidir": "BIDIRECTIONAL-UCS"} #ime algoritma u ispisu
+
+def run_search(alg, space, start, goal_states, h=None, reverse=None, stats=None): #pokretanje odabranog algoritma nad prostorom stanja
+    is_goal = goal_table(space, goal_states)
+    if alg == "bfs":
+        return bfs_search(space, start, is_goal, stats)
+    if alg == "ucs":
+        return ucs_search(space, start, is_goal, stats)
+    if alg == "astar":
+        return astar_search(space, start, is_goal, h, stats)
+    if alg == "idastar":
+        return idastar_search(space, start, is_goal, h, stats)
+    return bidirectional_search(space, reverse, start, is_goal, goal_states, stats)
+
+def report(alg, space, result, filename, stats=None): #ispis rezultata i, ako se mjeri, JSON mjerenja na standardni izlaz za greske
+    if result is None: #ako putanja nije pronadena
+        print_no_solution(ALGORITHMS[alg])
+    else:
+        path, visited, total_cost = result
+        print_output(ALGORITHMS[alg], [space.label(state) for state in path], visited, filename, total_cost if alg == "bfs" else f"{total_cost:.1f}")
+    if stats is not None:
+        print(stats.to_json(), file=sys.stderr)
+
+def solve(alg, filename, heuristic_file=None, stats=None): #jedan upit nad datotekom stanja
+    measure = SearchStats(alg) if stats is None else stats
+    with measure.phase("parse"):
+        start, goal, graph = load_graph(filename) #pocetno stanje, ciljevi i prijelazi iz datoteke
+        h = heuristic_table(graph, load_heuristics(heuristic_file)) if alg in ("astar", "idastar") else None #heuristicke vrijednosti za svako stanje iz datoteke
+        reverse = graph.reversed() if alg == "bidir" else None #obrnuti prijelazi za dvosmjernu pretragu
+    with measure.phase("search"):
+        result = run_search(alg, graph, start, goal, h, reverse, measure)
+    report(alg, graph, result, heuristic_file if alg in ("astar", "idastar") else filename, stats)
+
+def bfs(filename, stats=None): #algoritam pretrage u sirinu
+    solve("bfs", filename, None, stats)
+
+def ucs(filename, stats=None): #algoritam uniformne troskovne pretrage
+    solve("ucs", filename, None, stats)
+
+def astar(filename, heuristic_file, stats=None): #A* algoritam pretrage
+    solve("astar", filename, heuristic_file, stats)
+
+def idastar(filename, heuristic_file, stats=None): #IDA* algoritam pretrage
+    solve("idastar", filename, heuristic_file, stats)
+
+def bidirectional(filename, stats=None): #dvosmjerna uniformna troskovna pretraga
+    solve("bidir", filename, None, stats)
+
+def puzzle(alg, board, goal_board=None, heuristic="manhattan", stats=None): #pretraga implicitnog prostora slagalice bez datoteke stanja
+    measure = SearchStats(alg) if stats is None else stats
+    with measure.phase("parse"):
+        space = PuzzleSpace.from_board(board)
+        start = space.encode(board)
+        goal = space.encode(goal_board) if goal_board else space.default_goal()
+        h = PUZZLE_HEURISTICS[heuristic](space, goal) if alg in ("astar", "idastar") else None
+    if not space.solvable(start, goal): #ciljna ploca nije dohvatljiva, pretraga bi obisla cijeli prostor
+        report(alg, space, None, heuristic, stats)
+        return
+    with measure.phase("search"): #potezi su reverzibilni, prostor je sam sebi obrnuti
+        result = run_search(alg, space, start, [goal], h, space, measure)
+    report(alg, space, result, heuristic, stats)
+
+def batch(filename, heuristic_file, queries, cache_size=16, stats=False): #vise upita nad jednom ucitanim prostorom stanja
+    #svaki upit je redak oblika: algoritam pocetno_stanje ciljno_stanje [ciljno_stanje ...]
+    load = SearchStats("load")
+    with load.phase("parse"):
+        _, _, graph = load_graph(filename) #prijelazi se ucitavaju samo jednom
+        h = heuristic_table(graph, load_heuristics(heuristic_file)) if heuristic_file else None
+    if stats:
+        print(load.to_json(), file=sys.stderr)
+    reverse = None #obrnuti graf, gradi se kod prvog dvosmjernog upita
+    trees = OrderedDict() #LRU spremnik stabala najkracih putova po pocetnom stanju
+    for line in queries:
+        parts = line.split()
+        if not parts or parts[0].startswith('#'):
+            continue
+        alg, states = parts[0], parts[1:]
+        unknown = [state for state in states if state not in graph.index]
+        if alg not in ALGORITHMS or len(states) < 2 or unknown or alg in ("astar", "idastar") and h is None:
+            print(f"# INVALID QUERY: {line.strip()}", file=sys.stderr)
+            print_no_solution(ALGORITHMS.get(alg, alg.upper()))
+            continue
+        start, goal = graph.index[states[0]], [graph.index[state] for state in states[1:]]
+        measure = SearchStats(alg)
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        with measure.phase("search"):
+            if alg == "ucs":
+                tree = trees.pop(start, None) or ShortestPathTree(graph, start)
+                trees[start] = tree #zadnje koristeno stablo na kraj
+                if len(trees) > cache_size:
+                    trees.popitem(last=False) #izbacivanje najdulje nekoristenog stabla
+                result = tree.query(goal, measure)
+            else:
+                if alg == "bidir" and reverse is None:
+                    reverse = graph.reversed()
+                result = run_search(alg, graph, start, goal, h, reverse, measure)
+        report(alg, graph, result, heuristic_file, measure if stats else None)
+        sys.stdout.flush() #rezultat se ispisuje odmah nakon upita
+
+def calculate_costs(goal, graph): #h* za sva stanja jednim Dijkstrom od svih ciljeva po obrnutom grafu
+    reverse = graph.reversed() #obrnuti prijelazi
+    frontier, cost = Frontier(), graph.table(float('inf')) #prioritetni red, trosak do cilja
+    for state in goal: #svi ciljevi su izvori s troskom 0
+        cost[state] = 0.0
+        frontier.push(0.0, state, 0.0)
+    while True:
+        entry = frontier.pop(cost) #stanje s najmanjim troskom do cilja
+        if entry is None: #prioritetni red je prazan
+            return cost #beskonacan trosak za stanja koja ne mogu doci do cilja
+        current, current_cost = entry
+        for prev, prev_cost in reverse.successors(current): #prethodna stanja trenutnog stanja
+            new_cost = current_cost + prev_cost #novi trosak do cilja
+            if new_cost < cost[prev]: #prethodno stanje nije obradeno ili ima jeftiniji put
+                frontier.push(new_cost, prev, new_cost) #prethodno stanje u prioritetni red
+                cost[prev] = new_cost #azurira trosak do cilja
 
 
 def check_optimistic(filename, heuristic_file): #provjera optimisticnosti za sva stanja
     heuristics = load_heuristics(heuristic_file) #heuristicke vrijednosti iz datoteke
-    start, goal, transitions = load_transitions(filename) #pocetno stanje, ciljevi i prijelazi
+    start, goal, graph = load_graph(filename) #pocetno stanje, ciljevi i prijelazi
+    costs = calculate_costs(goal, graph) #stvarni troskovi do cilja za sva stanja
     opt = True #optimisticna je
     print(f"# HEURISTIC-OPTIMISTIC {heuristic_file}")
     for state, heuristic_value in heuristics.items(): #za svako stanje i heuristicku vrijednost
-        cost = calculate_cost(state, goal,transitions) #izracunava trosak
+        cost = costs[graph.index[state]] if state in graph.index else float('inf') #trosak do cilja, beskonacan ako cilj nije dohvatljiv
         if heuristic_value <= cost: #heuristicka vrijednost manja ili jednaka stvarnom trosku
             print(f"[CONDITION]: [OK] h({state}) <= h*: {heuristic_value:.1f} <= {cost:.1f}")
         else:
@@ -144,20 +768,35 @@ def check_optimistic(filename, heuristic_file): #provjera optimisticnosti za sva
         print("[CONCLUSION]: Heuristic is not optimistic.")
 
 
-def check_consistent(filename, heuristic_file): #provjera konzistentnosti za sva stanja
-    start, goal, transitions = load_transitions(filename) #pocetno stanje, ciljevi i prijelazi
-    heuristics = load_heuristics(heuristic_file) #heuristicke vrijednosti iz datoteke
-    print("# HEURISTIC-CONSISTENT {heuristic_file}")
-    cons = True #je konzistentna
-    for state, edges in transitions.items(): #sva stanja i prijelazi
-        for next_state, cost in edges:
-            if heuristics[state] > heuristics[next_state] + cost: #provjera konzistentnosti
-                print(f"[CONDITION]: [ERR] h({state}) <= h({next_state}) + c: {heuristics[state]:.1f} <= {heuristics[next_state]:.1f} + {cost:.1f}")
-                cons = False #nije konzistentna
-            else:
-                print(f"[CONDITION]: [OK] h({state}) <= h({next_state}) + c: {heuristics[state]:.1f} <= {heuristics[next_state]:.1f} + {cost:.1f}")
+def check_consistent(filename, heuristic_file, violations_only=False): #provjera konzistentnosti za sve prijelaze u jednom prolazu
+    start, goal, graph = load_graph(filename) #pocetno stanje, ciljevi i prijelazi
+    h = heuristic_table(graph, load_heuristics(heuristic_file)) #heuristicke vrijednosti po indeksu stanja
+    offsets, targets, costs = graph.offsets, graph.targets, graph.costs
+    #dijelovi retka koji ovise samo o stanju ili trosku formatiraju se jednom, a ne za svaki prijelaz
+    labels = [f"h({name})" for name in graph.names]
+    values = [f"{value:.1f}" for value in h]
+    cost_text = {}
+    print(f"# HEURISTIC-CONSISTENT {heuristic_file}")
+    consistent = True
+    lines = [] #redci se pisu u blokovima umjesto jednim print pozivom po prijelazu
+    for state in graph.order: #prijelazi redoslijedom iz datoteke
+        h_state, label, value = h[state], labels[state], values[state]
+        for edge in range(offsets[state], offsets[state + 1]):
+            target, cost = targets[edge], costs[edge]
+            error = h_state > h[target] + float(cost) #h(s) > h(t) + c
+            if error:
+                consistent = False
+            elif violations_only:
+                continue
+            if cost not in cost_text:
+                cost_text[cost] = f"{float(cost):.1f}"
+            lines.append(f"[CONDITION]: [{'ERR' if error else 'OK'}] {label} <= {labels[target]} + c: {value} <= {values[target]} + {cost_text[cost]}\n")
+            if len(lines) >= 65536:
+                sys.stdout.write("".join(lines))
+                lines.clear()
+    sys.stdout.write("".join(lines))
 
-    if cons: # je li konzistentna
+    if consistent: # je li konzistentna
         print("[CONCLUSION]: Heuristic is consistent.")
     else:
         print("[CONCLUSION]: Heuristic is not consistent.")
@@ -173,18 +812,51 @@ if "--h" in sys.argv:
     h_index = sys.argv.index("--h") + 1
     heuristic_file = sys.argv[h_index]
 
-if "--alg" in sys.argv:
+stats = SearchStats() if "--stats" in sys.argv else None #mjerenja pretrage kao JSON na standardni izlaz za greske
+if stats is not None:
+    tracemalloc.start()
+
+if "--compile" in sys.argv: #prevodenje ulaznih datoteka u binarni oblik za brze ucitavanje u iducim pokretanjima
+    if filename:
+        compile_graph(filename)
+        print(f"# COMPILED {filename} -> {filename}.bin", file=sys.stderr)
+    if heuristic_file and os.path.exists(heuristic_file):
+        compile_heuristics(heuristic_file)
+        print(f"# COMPILED {heuristic_file} -> {heuristic_file}.bin", file=sys.stderr)
+
+if "--batch" in sys.argv: #upiti iz datoteke ili sa standardnog ulaza (-)
+    queries_file = sys.argv[sys.argv.index("--batch") + 1]
+    cache_size = int(sys.argv[sys.argv.index("--cache") + 1]) if "--cache" in sys.argv else 16
+    if queries_file == "-":
+        batch(filename, heuristic_file, sys.stdin, cache_size, stats is not None)
+    else:
+        with open(queries_file, 'r') as file:
+            batch(filename, heuristic_file, file, cache_size, stats is not None)
+elif "--puzzle" in sys.argv: #slagalica bez datoteke stanja, --h je ime heuristike
+    board = sys.argv[sys.argv.index("--puzzle") + 1]
+    goal_board = sys.argv[sys.argv.index("--puzzle-goal") + 1] if "--puzzle-goal" in sys.argv else None
+    alg = sys.argv[sys.argv.index("--alg") + 1] if "--alg" in sys.argv else "astar"
+    if stats is not None:
+        stats.alg = alg
+    puzzle(alg, board, goal_board, heuristic_file or "manhattan", stats)
+elif "--alg" in sys.argv:
     alg_index = sys.argv.index("--alg") + 1
     alg = sys.argv[alg_index]
+    if stats is not None:
+        stats.alg = alg
     if alg == "bfs":
-        bfs(filename)
+        bfs(filename, stats)
     elif alg == "ucs":
-        ucs(filename)
+        ucs(filename, stats)
     elif alg == "astar":
-        astar(filename, heuristic_file)
+        astar(filename, heuristic_file, stats)
+    elif alg == "idastar":
+        idastar(filename, heuristic_file, stats)
+    elif alg == "bidir":
+        bidirectional(filename, stats)
     
 if "--check-optimistic" in sys.argv:
     check_optimistic(filename, heuristic_file)
 
 if "--check-consistent" in sys.argv:
-    check_consistent(filename, heuristic_file)
+    check_consistent(filename, heuristic_file, "--violations-only" in sys.argv)
@@ -1,38 +1,523 @@
 import sys
 import re
-from collections import deque
+import time
+import json
+import resource
+import multiprocessing
+from collections import ChainMap, deque
+from heapq import heappush, heappop
 
 def load_resolution(filename): #učitavanje podataka
     with open(filename, 'r') as file:
         lines = [line.strip() for line in file.readlines() if not line.startswith('#') and line.strip()]
     return lines
 
-def negate(literal): #negiranje literala
-    literal = literal.strip()
-    return literal[1:] if literal.startswith('~') else '~' + literal
+class Literals:
+    #tablica interniranih literala: svaka varijabla dobiva jedan bit,
+    #klauzula je par bitovnih maski (pozitivni literali, negirani literali)
+    def __init__(self):
+        self.index = dict() #ime varijable -> redni broj bita
+        self.names = [] #redni broj bita -> ime varijable
+
+    def bit(self, name): #bit varijable, nova varijabla dobiva sljedeći slobodni bit
+        if name not in self.index:
+            self.index[name] = len(self.names)
+            self.names.append(name)
+        return 1 << self.index[name]
+
+    def clause(self, line): #pretvaranje retka "a v ~b" u par maski
+        pos, neg = 0, 0
+        for literal in re.split(' V | v ', line):
+            literal = literal.strip()
+            if literal.startswith('~'):
+                neg |= self.bit(literal[1:])
+            else:
+                pos |= self.bit(literal)
+        return pos, neg
+
+    def literals(self, clause): #imena literala klauzule redom kojim su varijable prvi put viđene
+        pos, neg = clause
+        names = []
+        for i, name in enumerate(self.names):
+            if pos >> i & 1:
+                names.append(name)
+            if neg >> i & 1:
+                names.append('~' + name)
+        return names
+
+    def format(self, clause): #ispis klauzule
+        if clause == "NIL":
+            return clause
+        return ' v '.join(self.literals(clause)).lower()
+
+def negated(clause): #skup jednočlanih klauzula koje čine negaciju klauzule
+    pos, neg = clause
+    return [(0, bit) for bit in bits(pos)] + [(bit, 0) for bit in bits(neg)]
+
+def bits(mask): #pojedinačni bitovi maske
+    while mask:
+        bit = mask & -mask
+        yield bit
+        mask ^= bit
+
+def tautology(clause): #klauzula sadrži literal i njegovu negaciju
+    return clause[0] & clause[1] != 0
+
+def length(clause): #broj literala u klauzuli
+    return bin(clause[0] | clause[1]).count('1')
+
+def complementary(clause1, clause2): #maska varijabli koje se u dvije klauzule javljaju suprotnog predznaka
+    return clause1[0] & clause2[1] | clause1[1] & clause2[0]
+
+class OccurrenceIndex:
+    #indeks pojavljivanja: literal -> skup klauzula koje ga sadrže,
+    #pozitivni literal je bit varijable, negirani je njegova negativna vrijednost
+    def __init__(self, clauses=()):
+        self.occurs = dict()
+        self.clauses = set() #sve klauzule u indeksu
+        for clause in clauses:
+            self.add(clause)
+
+    def __contains__(self, clause):
+        return clause in self.clauses
+
+    def add(self, clause): #dodavanje klauzule pod svaki njezin literal
+        self.clauses.add(clause)
+        for bit in bits(clause[0]):
+            self.occurs.setdefault(bit, set()).add(clause)
+        for bit in bits(clause[1]):
+            self.occurs.setdefault(-bit, set()).add(clause)
+
+    def keys(self, clause): #literali klauzule kao ključevi indeksa
+        return [bit for bit in bits(clause[0])] + [-bit for bit in bits(clause[1])]
+
+    def discard(self, clause): #uklanjanje klauzule iz indeksa
+        self.clauses.discard(clause)
+        for key in self.keys(clause):
+            entry = self.occurs.get(key)
+            if entry is not None:
+                entry.discard(clause)
+                if not entry:
+                    del self.occurs[key]
+
+    def partners(self, clause): #klauzule s barem jednim literalom komplementarnim literalu klauzule
+        found = set()
+        for bit in bits(clause[0]):
+            found.update(self.occurs.get(-bit, ()))
+        for bit in bits(clause[1]):
+            found.update(self.occurs.get(bit, ()))
+        return found
+
+    def subsumer(self, clause): #neka klauzula u indeksu koja je podskup klauzule, ili None
+        pos, neg = ~clause[0], ~clause[1] #literali koji se ne nalaze u klauzuli
+        for key in self.keys(clause):
+            for other in self.occurs.get(key, ()):
+                if not (other[0] & pos or other[1] & neg):
+                    return other
+        return None
+
+    def subsumed(self, clause): #klauzule u indeksu koje sadrže sve literale klauzule
+        entries = sorted((self.occurs.get(key, set()) for key in self.keys(clause)), key=len)
+        return entries[0].intersection(*entries[1:]) if entries else set()
 
 def resolve(clause1, clause2, neg):
     #radimo uniju dvije klauzule, te potom mičemo komplementarne literale
-    new_clause = set()
-    for literal in clause1:
-        new_clause.add(literal)
-    for literal in clause2:
-        new_clause.add(literal)
+    pos = (clause1[0] | clause2[0]) & ~neg
+    new_neg = (clause1[1] | clause2[1]) & ~neg
 
-    for literal in neg:
-        new_clause.remove(literal)
-        new_clause.remove(negate(literal))
-
-    if not new_clause:
+    if not pos and not new_neg:
         return "NIL"
-    
-    return frozenset(new_clause)
 
-def print_traceback(dictall, counter1, camefrom):
+    return pos, new_neg
+
+def resident_memory(): #trenutna memorija procesa u bajtovima (RSS), bez /proc vršna memorija procesa
+    try:
+        with open("/proc/self/statm", 'rb') as file:
+            return int(file.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+class BudgetExceeded(Exception): #rezolucija je potrošila zadano ograničenje
+    pass
+
+class Budget:
+    #ograničenja jednog zasićenja ili upita (None bez ograničenja): broj zadržanih klauzula, broj koraka (zadanih klauzula),
+    #vrijeme u sekundama i memorija u bajtovima koju zasićenje ili upit zauzme povrh memorije procesa na početku;
+    #usput se bilježi potrošnja za ispis napretka i statistike
+    def __init__(self, max_clauses=None, timeout=None, max_rounds=None, max_memory=None, progress=None):
+        self.max_clauses = max_clauses
+        self.timeout = timeout
+        self.max_rounds = max_rounds
+        self.max_memory = max_memory
+        self.progress = progress #razmak između redaka napretka u sekundama, None bez ispisa
+        self.deadline = None
+        self.memory_base = 0 #memorija procesa na početku trenutnog zasićenja
+        self.run_rounds = 0 #koraci trenutnog zasićenja
+        self.rounds = 0 #ukupni broj koraka
+        self.resolvents = 0 #ukupni broj izvedenih rezolventi
+        self.peak_clauses = 0 #najveći broj zadržanih klauzula
+        self.peak_length = 0 #najdulja zadržana klauzula
+        self.queries = 0 #broj odgovorenih upita
+        self.exceeded = 0 #broj prekinutih zasićenja
+        self.started = self.printed = time.monotonic()
+
+    def limits(self): #ograničenja u obliku koji se šalje drugom procesu
+        return self.max_clauses, self.timeout, self.max_rounds, self.max_memory
+
+    def start(self): #početak mjerenja jednog zasićenja ili upita
+        self.deadline = time.monotonic() + self.timeout if self.timeout is not None else None
+        self.run_rounds = 0
+        if self.max_memory is not None:
+            self.memory_base = resident_memory()
+        return self
+
+    def check(self, clauses=0): #jedan korak rezolucije, baca BudgetExceeded kod prekoračenja
+        self.rounds += 1
+        self.run_rounds += 1
+        if clauses > self.peak_clauses:
+            self.peak_clauses = clauses
+        if self.max_clauses is not None and clauses > self.max_clauses \
+                or self.max_rounds is not None and self.run_rounds > self.max_rounds \
+                or self.max_memory is not None and resident_memory() - self.memory_base > self.max_memory:
+            self.exceeded += 1
+            raise BudgetExceeded()
+        if self.deadline is None and self.progress is None:
+            return
+        now = time.monotonic()
+        if self.deadline is not None and now > self.deadline:
+            self.exceeded += 1
+            raise BudgetExceeded()
+        if self.progress is not None and now - self.printed >= self.progress: #redak napretka na standardni izlaz za greške
+            self.printed = now
+            print(f"# PROGRESS: round {self.rounds}, {clauses} clauses, {self.resolvents / (now - self.started):.0f} resolvents/s, longest clause {self.peak_length}", file=sys.stderr)
+
+    def kept(self, clause): #zadržana rezolventa
+        size = length(clause)
+        if size > self.peak_length:
+            self.peak_length = size
+
+    def usage(self): #potrošnja koja se iz procesa iz skupa vraća glavnom procesu
+        return self.rounds, self.resolvents, self.peak_clauses, self.peak_length, self.exceeded
+
+    def merge(self, usage): #dodavanje potrošnje drugog procesa
+        rounds, resolvents, peak_clauses, peak_length, exceeded = usage
+        self.rounds += rounds
+        self.resolvents += resolvents
+        self.peak_clauses = max(self.peak_clauses, peak_clauses)
+        self.peak_length = max(self.peak_length, peak_length)
+        self.exceeded += exceeded
+
+    def to_json(self): #statistika cijelog pokretanja kao jedan JSON redak
+        elapsed = time.monotonic() - self.started
+        return json.dumps({
+            "rounds": self.rounds,
+            "resolvents": self.resolvents,
+            "resolvents_per_sec": round(self.resolvents / elapsed) if elapsed else None,
+            "peak_clauses": self.peak_clauses,
+            "peak_clause_length": self.peak_length,
+            "queries": self.queries,
+            "budget_exceeded": self.exceeded,
+            "peak_memory_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+            "elapsed": round(elapsed, 6),
+        })
+
+class Saturation:
+    #zadržane klauzule petlje zadane klauzule, s potporom (skupom početnih klauzula iz kojih je klauzula izvedena)
+    #active: već obrađene klauzule koje se rješavaju samo sa zadanom klauzulom; aktivna klauzula jednaka klauzuli iz skupa
+    #potpore ili klauzula koja obuhvati rezolventu i sama postaje zadana klauzula, jer je inače ne bi rezolvirala nijedna druga
+    def __init__(self, active=(), support=None):
+        self.kept = OccurrenceIndex() #sve zadržane klauzule, za provjeru subsumpcije
+        self.processed = OccurrenceIndex() #obrađene klauzule, kandidati za rezoluciju
+        self.support = dict() if support is None else support #klauzula -> skup početnih klauzula
+        self.camefrom = dict() #izvedena klauzula -> roditelji
+        self.subsumers = set() #klauzule koje su obuhvatile (i time izbacile) neku drugu klauzulu
+        self.active = set(active) #aktivne klauzule koje još nisu bile zadane
+        for clause in active:
+            self.kept.add(clause)
+            self.processed.add(clause)
+            self.support.setdefault(clause, frozenset([clause]))
+
+    def discard(self, clause): #uklanjanje zadržane klauzule
+        self.kept.discard(clause)
+        self.processed.discard(clause)
+        self.active.discard(clause)
+
+    def saturate(self, passive, dictall=None, budget=None):
+        #glavna petlja zadane klauzule: uvijek se obrađuje najkraća neobrađena klauzula,
+        #rezolvente se odbacuju ako su tautologije ili ih već postojeća klauzula obuhvaća (subsumpcija),
+        #a nova rezolventa briše sve postojeće klauzule koje obuhvaća
+        #vraća roditelje klauzule NIL ili None kada se više ništa novo ne može izvesti
+        kept, processed, support = self.kept, self.processed, self.support
+        queue = [] #neobrađene klauzule po duljini
+        for clause in passive:
+            if tautology(clause):
+                continue
+            if clause in self.active: #negirani cilj jednak klauzuli baze
+                self.active.discard(clause)
+            elif clause in kept: #već zadana klauzula
+                continue
+            else:
+                kept.add(clause)
+                support.setdefault(clause, frozenset([clause]))
+            heappush(queue, (length(clause), len(queue), clause))
+        order = len(queue)
+        while queue:
+            _, _, given = heappop(queue) #najkraća neobrađena klauzula
+            if given not in kept: #klauzulu je u međuvremenu obuhvatila kraća
+                continue
+            if budget is not None:
+                budget.check(len(kept.clauses))
+            processed.add(given)
+            for partner in processed.partners(given):
+                neg = complementary(given, partner)
+                if neg & (neg - 1): #više komplementarnih parova daje samo tautologije
+                    continue
+                new_clause = resolve(given, partner, neg)
+                if budget is not None:
+                    budget.resolvents += 1
+                if new_clause == "NIL":
+                    return given, partner
+                if tautology(new_clause):
+                    continue
+                subsumer = kept.subsumer(new_clause) #unaprijedna subsumpcija
+                if subsumer is not None: #dovoljno je zapamtiti jednu klauzulu koja obuhvaća rezolventu
+                    self.subsumers.add(subsumer)
+                    if subsumer in self.active: #aktivna klauzula zamjenjuje rezolventu kao zadana klauzula
+                        self.active.discard(subsumer)
+                        heappush(queue, (length(subsumer), order, subsumer))
+                        order += 1
+                    continue
+                for old in kept.subsumed(new_clause): #unatražna subsumpcija
+                    self.discard(old)
+                    self.subsumers.add(new_clause)
+                kept.add(new_clause)
+                if budget is not None:
+                    budget.kept(new_clause)
+                self.camefrom[new_clause] = (given, partner)
+                support[new_clause] = support[given] | support[partner]
+                if dictall is not None:
+                    dictall.setdefault(new_clause, len(dictall) + 1)
+                heappush(queue, (length(new_clause), order, new_clause))
+                order += 1
+        return None
+
+class KnowledgeBase:
+    #baza znanja kuharskog asistenta: skup klauzula se drži zasićenim rezolucijom,
+    #pa upit rješava samo negirani cilj nad već izvedenim klauzulama, bez mijenjanja baze
+    #s engine="dpll" baza se ne zasićuje, nego se svaki upit rješava DPLL-om nad trenutnim klauzulama
+    #ako zasićenje premaši ograničenje, baza je nepotpuna: upit tada može dokazati cilj, ali ne i odbaciti ga
+    def __init__(self, clauses=(), engine="resolution", budget=None):
+        self.base = set() #klauzule koje je zadao korisnik
+        self.engine = engine
+        self.budget = budget
+        self.rebuild(clauses)
+
+    def saturate(self, passive): #nastavak zasićenja unutar ograničenja
+        try:
+            self.contradiction = self.state.saturate(passive, budget=self.budget.start() if self.budget else None)
+        except BudgetExceeded:
+            self.complete = False
+
+    def rebuild(self, clauses=(), lemmas=()): #ponovno zasićenje od početnih klauzula i još valjanih izvedenih klauzula
+        self.state = Saturation()
+        self.base.update(clauses)
+        self.contradiction = None #roditelji NIL ako je baza proturječna
+        self.complete = True #zasićenje je dovršeno
+        if self.engine == "dpll":
+            return
+        for clause in lemmas: #izvedena klauzula zadržava svoju potporu
+            self.state.support[clause] = lemmas[clause]
+        self.saturate(list(lemmas) + sorted(self.base))
+
+    def add(self, clause): #dodavanje klauzule nastavlja zasićenje samo s novom klauzulom
+        if clause in self.base:
+            return
+        self.base.add(clause)
+        if self.engine == "dpll" or self.contradiction is not None:
+            return
+        if not self.complete: #novi pokušaj potpunog zasićenja
+            self.rebuild()
+            return
+        self.saturate([clause])
+
+    def remove(self, clause): #brisanje klauzule poništava samo izvode koji ovise o njoj
+        if clause not in self.base:
+            return
+        self.base.discard(clause)
+        if self.engine == "dpll":
+            return
+        if self.contradiction is not None or not self.complete: #zasićenje nije dovršeno
+            self.rebuild()
+            return
+        state = self.state
+        invalid = [other for other in state.kept.clauses if clause in state.support[other]]
+        for other in invalid:
+            state.discard(other)
+        if not state.subsumers.intersection(invalid):
+            return
+        #poništena klauzula je obuhvatila druge klauzule ili rezolvente, zasićenje se ponavlja s preostalim izvodima
+        self.rebuild(lemmas={other: state.support[other] for other in state.kept.clauses})
+
+    def query(self, goal, budget=None): #vraća True ako baza povlači cilj, None ako to nije utvrđeno unutar ograničenja
+        if self.engine == "dpll":
+            return entails(self.base, goal, budget)
+        if self.contradiction is not None:
+            return True
+        support = ChainMap(dict(), self.state.support) #potpore izvedenih klauzula upita ne ulaze u bazu
+        if Saturation(self.state.kept.clauses, support).saturate(negated(goal), budget=budget) is not None:
+            return True
+        return False if self.complete else None
+
+    def snapshot(self): #klauzule dovoljne za odgovor na upit u drugom procesu i je li zasićenje dovršeno, None ako je baza proturječna
+        if self.engine == "dpll":
+            return sorted(self.base), True
+        if self.contradiction is not None:
+            return None
+        return sorted(self.state.kept.clauses), self.complete
+
+def answer_query(job):
+    #odgovor na upit nad snimkom baze u procesu iz skupa procesa
+    #job: (snimka baze, cilj, engine, ograničenja), vraća (True, False ili None ako ograničenje nije dopustilo odgovor, potrošnja)
+    snapshot, goal, engine, limits = job
+    budget = Budget(*limits).start()
+    if snapshot is None: #proturječna baza povlači svaki cilj
+        return True, budget.usage()
+    clauses, complete = snapshot
+    try:
+        if engine == "dpll":
+            answer = entails(clauses, goal, budget)
+        elif Saturation(clauses).saturate(negated(goal), budget=budget) is not None: #zasićena baza, rezolvira se samo cilj
+            answer = True
+        else:
+            answer = False if complete else None
+    except BudgetExceeded:
+        answer = None
+    return answer, budget.usage()
+
+class DPLL:
+    #DPLL nad istim klauzulama (parovima maski): propagacija jediničnih klauzula s dva promatrana literala,
+    #eliminacija čistih literala na početku i kronološko vraćanje
+    #literal je cijeli broj 2 * varijabla za pozitivni i 2 * varijabla + 1 za negirani, negacija je literal ^ 1
+    def __init__(self, clauses):
+        self.clauses = [] #klauzule s barem dva literala, prva dva su promatrana
+        self.units = [] #jednočlane klauzule
+        self.empty = False #postoji prazna klauzula
+        count = 0 #broj varijabli
+        for pos, neg in clauses:
+            if pos & neg: #tautologija je uvijek zadovoljena
+                continue
+            literals = [2 * (bit.bit_length() - 1) for bit in bits(pos)] + [2 * (bit.bit_length() - 1) + 1 for bit in bits(neg)]
+            count = max([count] + [(literal >> 1) + 1 for literal in literals])
+            if not literals:
+                self.empty = True
+            elif len(literals) == 1:
+                self.units.append(literals[0])
+            else:
+                self.clauses.append(literals)
+        self.value = [-1] * count #vrijednost varijable: -1 nepridružena, 0 ili 1
+        self.watches = [[] for _ in range(2 * count)] #literal -> klauzule koje ga promatraju
+        for i, literals in enumerate(self.clauses):
+            self.watches[literals[0]].append(i)
+            self.watches[literals[1]].append(i)
+        occurrences = [0] * count
+        for literals in self.clauses:
+            for literal in literals:
+                occurrences[literal >> 1] += 1
+        self.order = sorted(range(count), key=lambda var: -occurrences[var]) #redoslijed odluka, češće varijable prve
+        self.trail = [] #istiniti literali redom pridruživanja
+        self.head = 0 #prvi literal na tragu koji još nije propagiran
+
+    def assign(self, literal): #literal postaje istinit, vraća False ako je već lažan
+        current = self.value[literal >> 1]
+        if current == -1:
+            self.value[literal >> 1] = 1 ^ (literal & 1)
+            self.trail.append(literal)
+            return True
+        return current != literal & 1
+
+    def propagate(self): #propagacija jediničnih klauzula, vraća False kod konflikta
+        value, clauses, watches = self.value, self.clauses, self.watches
+        while self.head < len(self.trail):
+            false = self.trail[self.head] ^ 1 #literal koji je upravo postao lažan
+            self.head += 1
+            watching = watches[false]
+            keep = [] #klauzule koje i dalje promatraju lažni literal
+            for n, i in enumerate(watching):
+                literals = clauses[i]
+                if literals[0] == false:
+                    literals[0], literals[1] = literals[1], false
+                other = literals[0]
+                if value[other >> 1] == 1 ^ (other & 1): #klauzula je zadovoljena drugim promatranim literalom
+                    keep.append(i)
+                    continue
+                for k in range(2, len(literals)): #zamjenski literal koji nije lažan
+                    if value[literals[k] >> 1] != literals[k] & 1:
+                        literals[1], literals[k] = literals[k], false
+                        watches[literals[1]].append(i)
+                        break
+                else:
+                    keep.append(i)
+                    if not self.assign(other): #svi literali su lažni
+                        keep.extend(watching[n + 1:])
+                        watches[false] = keep
+                        return False
+            watches[false] = keep
+        return True
+
+    def pure(self): #pridruživanje čistih literala u još nezadovoljenim klauzulama
+        value = self.value
+        while True:
+            seen = set()
+            for literals in self.clauses:
+                if any(value[literal >> 1] == 1 ^ (literal & 1) for literal in literals):
+                    continue
+                seen.update(literal for literal in literals if value[literal >> 1] == -1)
+            pure = [literal for literal in seen if literal ^ 1 not in seen]
+            if not pure:
+                return True
+            for literal in pure:
+                self.assign(literal)
+            if not self.propagate():
+                return False
+
+    def backtrack(self, size): #poništavanje pridruživanja do zadane duljine traga
+        for literal in self.trail[size:]:
+            self.value[literal >> 1] = -1
+        del self.trail[size:]
+        self.head = size
+
+    def solve(self, budget=None): #vraća True ako su klauzule zadovoljive
+        if self.empty or not all(self.assign(literal) for literal in self.units):
+            return False
+        if not self.propagate() or not self.pure():
+            return False
+        decisions = [] #(duljina traga prije odluke, literal odluke, je li odluka već obrnuta)
+        while True:
+            var = next((var for var in self.order if self.value[var] == -1), None)
+            if var is None: #sve varijable su pridružene bez konflikta
+                return True
+            if budget is not None:
+                budget.check()
+            decisions.append((len(self.trail), 2 * var, False))
+            self.assign(2 * var)
+            while not self.propagate():
+                while decisions and decisions[-1][2]: #obje vrijednosti već isprobane
+                    decisions.pop()
+                if not decisions:
+                    return False
+                size, literal, _ = decisions.pop()
+                self.backtrack(size)
+                decisions.append((size, literal ^ 1, True))
+                self.assign(literal ^ 1)
+
+def entails(clauses, goal, budget=None): #DPLL provjera je li (klauzule i negirani cilj) nezadovoljivo
+    return not DPLL(list(clauses) + negated(goal)).solve(budget)
+
+def print_traceback(dictall, counter1, camefrom, table):
     #printanje prvotnog zadanog skupa klauzula
     for i, key in enumerate(dictall.keys(), 1):
         if i < counter1:
-            print_key = ' v '.join(key).lower()
+            print_key = table.format(key)
             print(f'{dictall[key]}. {print_key}')
         else:
             break
@@ -53,7 +538,7 @@ def print_traceback(dictall, counter1, camefrom):
             k1 = dictall.get(new_parent1, "Unknown")
             k2 = dictall.get(new_parent2, "Unknown")
             
-            step = ' v '.join(current).lower() if isinstance(current, frozenset) else current
+            step = table.format(current)
             steps.append(f'{k}. {step} ({k1}, {k2})')
     #printanje trace-a do rješenja
     while steps:
@@ -61,122 +546,111 @@ def print_traceback(dictall, counter1, camefrom):
     print("===============")
 
 
-def resolution(file1):
+def resolution(file1, engine="resolution", trace=True, budget=None):
     lines = load_resolution(file1)
     original_target = lines[-1] #originalna finalna klauzula
-    clauses = set()
+    table = Literals() #tablica literala
+    clauses = []
     dictall = dict()
-    camefrom = dict()
-    counter = 1
-    #dodavanje klauzula u obliku skupa u skup svih klauzula
+    #dodavanje klauzula u obliku para maski u skup svih klauzula
     for line in lines[:-1]:
-        clause = frozenset([literal.strip() for literal in re.split(' V | v ', line)])
-        clauses.add(clause)
-        dictall[clause] = counter
-        counter += 1
-    remove = set()
-    for clause in clauses:
-        for literal in clause:
-            if negate(literal) in clause:
-                remove.add(clause)
-                break
-    clauses.difference_update(remove)
+        clause = table.clause(line)
+        if clause not in dictall:
+            dictall[clause] = len(dictall) + 1
+            if not tautology(clause):
+                clauses.append(clause)
     #kreiranje setofsupport iz finalne klauzule koju dokazujemo
-    setofsupport = set()
-    for lit in re.split(' V | v ', original_target):
-        setofsupport.add(frozenset([negate(lit).strip()]))
+    setofsupport = negated(table.clause(original_target))
     for clause in setofsupport:
-        dictall[clause] = counter
-        counter += 1
-    counter1 = counter
-    #proces nalaženja komplementarnih literala klauzulama te njihovo rješavanje
-    while True:
-        for clause in setofsupport:
-            for literal in clause:
-                if negate(literal) in clause:
-                    remove.add(clause)
-                    break
-        setofsupport.difference_update(remove)
-        new_clauses = set()
-        for clause1 in setofsupport:
-            for clause2 in clauses.union(setofsupport):
-                if clause1 != clause2:
-                    neg = set()
-                    for literal in clause1:
-                        if negate(literal) in clause2:
-                            neg.add(literal)
-                    if neg:
-                        new_clause = resolve(clause1, clause2, neg)
-                        if new_clause == "NIL":
-                            camefrom["NIL"] = (clause1, clause2)
-                            dictall["NIL"] = counter
-                            counter += 1
-                            print_traceback(dictall, counter1, camefrom)
-                            print(f"[CONCLUSION]: {original_target} is true") #pronalazak NIL-a i ispis točnosti klauzule
-                            return True
-                        camefrom[new_clause] = (clause1, clause2)
-                        if new_clause not in dictall.keys():
-                            dictall[new_clause] = counter
-                            counter += 1
-                        new_clauses.add(frozenset(new_clause))
-        if new_clauses.issubset(clauses.union(setofsupport)):
-            print(f"[CONCLUSION]: {original_target} is unknown") #ispis da klauzula nije pronađena
-            return False
-        else:
-            setofsupport.update(new_clauses)
+        dictall.setdefault(clause, len(dictall) + 1)
+    counter1 = len(dictall) + 1
+    proved = None #odgovor DPLL-a kada je baza zadovoljiva
+    try:
+        if engine == "dpll" and DPLL(clauses).solve(budget and budget.start()): #uz zadovoljivu bazu DPLL daje isti odgovor kao rezolucija sa skupom potpore
+            proved = entails(clauses, table.clause(original_target), budget)
+            if not proved or not trace:
+                conclusion(original_target, proved)
+                return proved
+            #ispis postupka rezolucije se dobiva rezolucijom, za koju se sada zna da dolazi do NIL
+        #rezolucija zadanih klauzula, uz skup potpore kao neobrađene klauzule
+        state = Saturation(clauses)
+        parents = state.saturate(setofsupport, dictall, budget and budget.start())
+    except BudgetExceeded: #dokazani cilj se ispisuje i bez postupka
+        conclusion(original_target, proved)
+        return proved
+    camefrom = state.camefrom
+    if parents is None:
+        print(f"[CONCLUSION]: {original_target} is unknown") #ispis da klauzula nije pronađena
+        return False
+    camefrom["NIL"] = parents
+    dictall["NIL"] = len(dictall) + 1
+    print_traceback(dictall, counter1, camefrom, table)
+    print(f"[CONCLUSION]: {original_target} is true") #pronalazak NIL-a i ispis točnosti klauzule
+    return True
     
-def cooking(file1, file2):
+def conclusion(target, answer): #ispis odgovora na upit
+    text = "unknown (budget exceeded)" if answer is None else "true" if answer else "unknown"
+    print(f"[CONCLUSION]: {target} is {text}")
+
+def cooking(file1, file2, engine="resolution", budget=None, jobs=None):
+    #s jobs upiti se šalju skupu procesa nad snimkom baze u trenutku upita, a odgovori se ispisuju redom upita
+    budget = Budget() if budget is None else budget
     lines1 = load_resolution(file1) #učitavanje podataka
-    clauses = set()
-    for line in lines1:
-        clause = frozenset([literal.strip() for literal in re.split(' V | v ', line)])
-        clauses.add(clause)
-    remove = set()
-    for clause in clauses: #nastanak skupa klauzula
-        for literal in clause:
-            if negate(literal) in clause:
-                remove.add(clause)
-                break
-    clauses.difference_update(remove)
+    table = Literals() #tablica literala
+    kb = KnowledgeBase((table.clause(line) for line in lines1), engine, budget) #nastanak zasićene baze znanja
     with open(file2, 'r') as file:
         lines2 = [line.strip() for line in file.readlines() if not line.startswith('#') and line.strip()] #učitavanje drugog file-a
+    pool = multiprocessing.get_context("fork").Pool(jobs) if jobs else None
+    pending = deque() #poslani upiti koji još nisu ispisani
     for line in lines2:
         line = line.strip()
         if line[-1] == "?": #traženje rezolucije za zadani target
-            original_target = line[:-1].strip() 
-            target = negate(original_target)  
-            clauses.add(frozenset({target})) 
-            while True:
-                new_clauses = set()
-                for clause1 in clauses:
-                    for clause2 in clauses:
-                        if clause1 != clause2:
-                            neg = set()
-                            for literal in clause1:
-                                if negate(literal) in clause2:
-                                    neg.add(literal)
-                            if neg:
-                                new_clause = resolve(clause1, clause2, neg)
-                                if new_clause == "NIL":
-                                    print(f"[CONCLUSION]: {original_target} is true")
-                                    return True
-                                new_clauses.add(frozenset(new_clause))
-                if new_clauses.issubset(clauses):
-                    print(f"[CONCLUSION]: {original_target} is unknown")
-                    return False
-                else:
-                    clauses.update(new_clauses)
+            original_target = line[:-1].strip()
+            goal = table.clause(original_target)
+            budget.queries += 1
+            if pool is None:
+                try:
+                    answer = kb.query(goal, budget.start())
+                except BudgetExceeded:
+                    answer = None
+                conclusion(original_target, answer)
+                continue
+            pending.append((original_target, pool.apply_async(answer_query, [(kb.snapshot(), goal, engine, budget.limits())])))
+            while pending and pending[0][1].ready(): #ispis odgovora koji su već gotovi, redom upita
+                target, result = pending.popleft()
+                answer, usage = result.get()
+                budget.merge(usage)
+                conclusion(target, answer)
         elif line[-1] == "+": #dodavanje klauzule u skup klauzula
-            clauses.add(frozenset([literal.strip() for literal in re.split(' V | v ', line[:-1].strip())]))
+            kb.add(table.clause(line[:-1].strip()))
         elif line[-1] == "-": #brisanje klauzule iz skupa klauzula
-            clauses.difference_update(frozenset([literal.strip() for literal in re.split(' V | v ', line[:-1].strip())]))
-
-if "resolution" in sys.argv:
-    ind = sys.argv.index("resolution") + 1
-    file1 = sys.argv[ind]
-    resolution(file1)
-if "cooking" in sys.argv:
-    ind = sys.argv.index("cooking") + 1
-    file1 = sys.argv[ind]
-    file2 = sys.argv[ind + 1]
-    cooking(file1, file2)
+            kb.remove(table.clause(line[:-1].strip()))
+    if pool is not None:
+        for target, result in pending:
+            answer, usage = result.get()
+            budget.merge(usage)
+            conclusion(target, answer)
+        pool.close()
+        pool.join()
+
+def option(name, convert=str, default=None): #vrijednost opcije naredbenog retka
+    return convert(sys.argv[sys.argv.index(name) + 1]) if name in sys.argv else default
+
+engine = option("--engine", default="resolution") #resolution ili dpll
+budget = Budget(option("--max-clauses", int), option("--timeout", float), option("--max-rounds", int),
+                option("--max-memory", lambda mb: int(float(mb) * 2 ** 20)), 1.0 if "--progress" in sys.argv else None) #ograničenja po zasićenju ili upitu
+jobs = option("--jobs", int) #broj procesa za paralelne upite
+values = ("--engine", "--max-clauses", "--timeout", "--max-rounds", "--max-memory", "--jobs") #opcije s vrijednošću
+args = [arg for i, arg in enumerate(sys.argv) if not arg.startswith("--") and not sys.argv[i - 1] in values] #argumenti bez opcija
+if "resolution" in args:
+    ind = args.index("resolution") + 1
+    file1 = args[ind]
+    budget.queries += 1
+    resolution(file1, engine, "--no-trace" not in sys.argv, budget)
+if "cooking" in args:
+    ind = args.index("cooking") + 1
+    file1 = args[ind]
+    file2 = args[ind + 1]
+    cooking(file1, file2, engine, budget, jobs)
+if "--stats" in sys.argv: #statistika na standardni izlaz za greške
+    print(budget.to_json(), file=sys.stderr)
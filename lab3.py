@@ -1,9 +1,13 @@
 import sys
 import math
+import multiprocessing
+import numpy as np
+from itertools import islice
 
-# globalne varijable za ispis informacijske dobiti i grana stabla
-ig_print = ""
-branches_print = ""
+# skup za treniranje (kodovi, vrijednosti, zaglavlje, ciljni stupac), postavlja se prije stvaranja skupa procesa
+training = None
+# inačica formata spremljenog modela, mijenja se pri svakoj nekompatibilnoj promjeni polja u datoteci
+MODEL_VERSION = 1
 
 def read_data(filepath):
     with open(filepath, 'r') as file: # učitava podatke iz CSV datoteke
@@ -11,167 +15,486 @@ def read_data(filepath):
         data = [line.strip().split(',') for line in file.readlines()] # učitava sve redke datoteke
     return header, data
 
-def entropy(data, target_index):
-    # broji pojavljivanja svake vrijednosti ciljne varijable
-    label_count = {}
-    for row in data:
-        label = row[target_index]
-        if label not in label_count:
-            label_count[label] = 0
-        label_count[label] += 1
-    # izračun entropije
+def encode_data(data, num_columns):
+    # kodira svaki stupac u cijele brojeve: kod vrijednosti je njezin indeks u sortiranoj listi vrijednosti stupca
+    codes = np.empty((len(data), num_columns), dtype=np.int32)
+    values = []
+    for column in range(num_columns):
+        column_values, codes[:, column] = np.unique(np.array([row[column] for row in data]), return_inverse=True)
+        values.append(column_values.tolist())
+    return codes, values
+
+def first_occurrence(keys, size):
+    # položaj prvog pojavljivanja svakog ključa (size ako se ključ ne pojavljuje)
+    first = np.full(size, len(keys), dtype=np.int64)
+    np.minimum.at(first, keys, np.arange(len(keys)))
+    return first
+
+def entropy(counts, first):
+    # entropija iz liste broja pojavljivanja oznaka; oznake se zbrajaju redom prvog pojavljivanja,
+    # kao pri prolazu kroz redke, pa je rezultat jednak do zadnjeg bita
+    total = sum(counts)
     ent = 0.0
-    total = len(data)
-    for label in label_count:
-        probability = label_count[label] / total
-        ent -= probability * math.log2(probability)
+    for _, count in sorted(zip(first, counts)):
+        if count:
+            probability = count / total
+            ent -= probability * math.log2(probability)
     return ent
 
-def information_gain(data, split_index, target_index):
-    # izračun entropije za cijeli skup podataka
-    total_entropy = entropy(data, target_index)
+def information_gains(codes, values, rows, features, target, block=64):
+    # informacijska dobit svih značajki za redke čvora iz tablica kontingencije (vrijednost značajke × oznaka),
+    # koje se za blok značajki dobivaju jednim prolazom bincount nad kodiranim redcima
+    labels = codes[rows, target].astype(np.int64)
+    num_labels = len(values[target])
+    total = len(rows)
+    total_entropy = entropy(np.bincount(labels, minlength=num_labels).tolist(), first_occurrence(labels, num_labels).tolist())
+    gains = []
+    for start in range(0, len(features), block):
+        block_features = features[start:start + block]
+        sizes = [len(values[feature]) * num_labels for feature in block_features]
+        offsets = np.cumsum([0] + sizes[:-1])
+        # ključ (značajka, vrijednost, oznaka), redom po redcima pa po značajkama
+        keys = (codes[np.ix_(rows, block_features)].astype(np.int64) * num_labels + labels[:, None] + offsets).ravel()
+        counts = np.bincount(keys, minlength=sum(sizes)).tolist()
+        first = first_occurrence(keys, sum(sizes)).tolist()
+        for offset, size in zip(offsets.tolist(), sizes):
+            subsets = []  # (prvo pojavljivanje vrijednosti, broj pojavljivanja oznaka, prva pojavljivanja oznaka)
+            for start_value in range(offset, offset + size, num_labels):
+                value_counts = counts[start_value:start_value + num_labels]
+                if any(value_counts):
+                    value_first = first[start_value:start_value + num_labels]
+                    subsets.append((min(value_first), value_counts, value_first))
+            gains.append(total_entropy - conditional_entropy(subsets, total))
+    return gains
+
+def conditional_entropy(subsets, total):
+    # izračun uvjetne entropije za podskupove, redom prvog pojavljivanja vrijednosti
     subset_entropy = 0.0
-
-    # grupacija podataka prema vrijednostima odabrane značajke
-    value_counts = {}
-    for row in data:
-        key = row[split_index]
-        if key not in value_counts:
-            value_counts[key] = []
-        value_counts[key].append(row)
-
-    # izračun uvjetne entropije za podskupove podataka
-    for key in value_counts:
-        subset_prob = len(value_counts[key]) / float(len(data))
-        subset_entropy += subset_prob * entropy(value_counts[key], target_index)
-
-    return total_entropy - subset_entropy
-
-def best_feature_to_split(data, header, target_index):
-    global ig_print
-    num_features = len(data[0])  # broj značajki
+    for _, value_counts, value_first in sorted(subsets):
+        subset_prob = sum(value_counts) / float(total)
+        subset_entropy += subset_prob * entropy(value_counts, value_first)
+    return subset_entropy
+
+def best_feature_to_split(codes, values, rows, features, header, target):
+    # informacijska dobit za sve još dostupne značajke odjednom;
+    # vraća stupac značajke s najboljom informacijskom dobiti i sortirane dobiti za ispis
+    return choose_feature(header, features, information_gains(codes, values, rows, features, target))
+
+def choose_feature(header, features, feature_gains):
+    # odabir značajke s najvećom dobiti (prva u poretku stupaca kod jednake dobiti) i dobiti sortirane za ispis
     best_gain = 0  # najbolja informacijska dobit
-    best_feature = -1  # indeks najbolje značajke
+    best_feature = -1  # stupac najbolje značajke
     gains = []  # lista informacijskih dobiti za sve značajke
 
-    # prolazi kroz sve značajke, računa informacijsku dobit za svaku
-    for feature in range(num_features):
-        if feature != target_index:  # zanemaruje ciljnu varijablu
-            gain = information_gain(data, feature, target_index)
-            gains.append((header[feature], gain))  
-            if gain > best_gain:  # nova najbolja informacijska dobit i značajka
-                best_gain = gain
-                best_feature = feature
+    for feature, gain in zip(features, feature_gains):
+        gains.append((header[feature], gain))
+        if gain > best_gain:  # nova najbolja informacijska dobit i značajka
+            best_gain = gain
+            best_feature = feature
 
     gains.sort(key=lambda x: (-x[1], x[0]))  # sortira prema informacijskoj dobiti (silazno), zatim abecedno
-    # ispis za informacijsku dobit
-    for name, gain in gains:
-        ig_print += f"IG({name})={gain:.4f} "
-    
-    return best_feature  # indeks značajke s najboljom informacijskom dobiti
-
-def build_tree(data, header, target_index, depth=None, level=1, branch=""):
-    global branches_print
+    return best_feature, gains
+
+class CompiledTree:
+    # stablo odluke u ravnim poljima, korijen je čvor 0:
+    # feature[i] je stupac značajke čvora (-1 za list), label[i] kod oznake lista ili većinske oznake čvora,
+    # a dijete čvora za kod vrijednosti c je children[offset[i] + c] (-1 ako grana ne postoji)
+    def __init__(self, header, values, target):
+        self.header = header  # zaglavlje skupa za treniranje
+        self.values = values  # vrijednosti stupaca skupa za treniranje po kodu
+        self.target = target  # stupac ciljne varijable
+        self.feature, self.label, self.offset, self.children = [], [], [], []
+
+    def add_leaf(self, label):
+        self.feature.append(-1)
+        self.label.append(label)
+        self.offset.append(0)
+        return len(self.feature) - 1
+
+    def add_node(self, feature, label):
+        # unutarnji čvor s većinskom oznakom, koja se koristi kada grana za vrijednost ne postoji
+        return self.split(self.add_leaf(label), feature)
+
+    def split(self, node, feature):
+        # list postaje unutarnji čvor koji se grana po značajki
+        self.feature[node] = feature
+        self.offset[node] = len(self.children)
+        self.children.extend([-1] * len(self.values[feature]))
+        return node
+
+    def set_child(self, node, code, child):
+        self.children[self.offset[node] + code] = child
+
+    def graft(self, arrays):
+        # dodaje podstablo izgrađeno u drugom procesu (liste feature, label, offset, children), vraća čvor njegova korijena
+        feature, label, offset, children = arrays
+        base, children_base = len(self.feature), len(self.children)
+        self.feature.extend(feature)
+        self.label.extend(label)
+        self.offset.extend(node_offset + children_base for node_offset in offset)
+        self.children.extend(child + base if child >= 0 else -1 for child in children)
+        return base
+
+    def finish(self):
+        # pretvara liste u polja nakon izgradnje
+        self.feature, self.label, self.offset, self.children = (np.array(array, dtype=np.int64) for array in (self.feature, self.label, self.offset, self.children))
+        return self
+
+    def save(self, filepath):
+        # sprema prevedeno stablo u .npz datoteku: polja stabla, zaglavlje, ciljni stupac i vrijednosti svih stupaca
+        # (spojene u jedno polje s brojem vrijednosti po stupcu), bez pickle objekata
+        np.savez_compressed(filepath, version=np.array(MODEL_VERSION), header=np.array(self.header), target=np.array(self.target),
+                            values=np.array([value for column_values in self.values for value in column_values]),
+                            sizes=np.array([len(column_values) for column_values in self.values], dtype=np.int64),
+                            feature=self.feature, label=self.label, offset=self.offset, children=self.children)
+
+    @staticmethod
+    def load(filepath):
+        with np.load(filepath, allow_pickle=False) as model:
+            if int(model["version"]) != MODEL_VERSION:
+                raise ValueError(f"unsupported model version {int(model['version'])} (expected {MODEL_VERSION})")
+            bounds = np.concatenate([[0], np.cumsum(model["sizes"])]).tolist()
+            all_values = model["values"].tolist()
+            values = [all_values[start:end] for start, end in zip(bounds, bounds[1:])]
+            compiled = CompiledTree(model["header"].tolist(), values, int(model["target"]))
+            compiled.feature, compiled.label, compiled.offset, compiled.children = (model[name] for name in ("feature", "label", "offset", "children"))
+        return compiled
+
+    def encode(self, header, data):
+        # kodira stupce koje stablo koristi kodovima skupa za treniranje (-1 za neviđenu vrijednost), stupci se traže po imenu
+        codes = np.full((len(data), len(self.header)), -1, dtype=np.int64)
+        for feature in set(self.feature[self.feature >= 0].tolist()):
+            column = np.array([row[header.index(self.header[feature])] for row in data])
+            known = np.array(self.values[feature])
+            position = np.minimum(np.searchsorted(known, column), len(known) - 1)
+            codes[:, feature] = np.where(known[position] == column, position, -1)
+        return codes
+
+    def walk(self, codes):
+        # obilazak stabla za sve redke odjednom, jedna razina po koraku; nakon k-tog koraka daje čvor do kojeg je
+        # svaki redak došao u k koraka (isto polje, mijenja se na mjestu)
+        features, offsets, children = np.asarray(self.feature), np.asarray(self.offset), np.asarray(self.children, dtype=np.int64)
+        node = np.zeros(len(codes), dtype=np.int64)
+        active = np.arange(len(codes))
+        yield node
+        while active.size:
+            feature = features[node[active]]
+            active, feature = active[feature >= 0], feature[feature >= 0]
+            code = codes[active, feature]
+            child = np.where(code >= 0, children[offsets[node[active]] + np.maximum(code, 0)], -1)
+            active, child = active[child >= 0], child[child >= 0]
+            node[active] = child
+            yield node
+
+    def route(self, codes):
+        # čvor u kojem je redak stao (list ili unutarnji čvor bez grane za vrijednost retka)
+        for node in self.walk(codes):
+            pass
+        return node
+
+    def height(self):
+        # najveća dubina lista; dijete uvijek ima veći broj od roditelja, pa je dubina roditelja poznata prije djeteta
+        depth = [0] * len(self.feature)
+        for node, (feature, offset) in enumerate(zip(np.asarray(self.feature).tolist(), np.asarray(self.offset).tolist())):
+            if feature >= 0:
+                for child in np.asarray(self.children)[offset:offset + len(self.values[feature])].tolist():
+                    if child >= 0:
+                        depth[child] = depth[node] + 1
+        return max(depth)
+
+    def predict_depths(self, codes):
+        # predikcije za svako ograničenje dubine 0..visina stabla: stablo ograničeno na dubinu d je puno stablo
+        # u kojem čvorovi na dubini d postaju listovi s većinskom oznakom, pa je predikcija oznaka čvora nakon d koraka
+        labels, height = np.asarray(self.label), self.height()
+        predictions = []
+        for node in self.walk(codes):
+            if len(predictions) > height:
+                break
+            predictions.append(labels[node])
+        return predictions + [predictions[-1]] * (height + 1 - len(predictions))
+
+    def predict(self, codes):
+        # redak bez grane za svoju vrijednost dobiva većinsku oznaku unutarnjeg čvora u kojem je stao
+        return np.asarray(self.label)[self.route(codes)]
+
+def build_tree(data, header, target_index, depth=None, jobs=None):
+    # kodira skup podataka jednom, a stablo gradi nad indeksima redaka; s jobs veća podstabla gradi skup procesa;
+    # vraća stablo kao rječnik (za ispis), prevedeno stablo (za predikciju) i zapise ispisa redom obilaska u dubinu
+    global training
+    codes, values = encode_data(data, len(header))
+    training = (codes, values, header, target_index)
+    available = np.ones(len(header), dtype=bool)  # značajke koje još nisu iskorištene na putu od korijena
+    available[target_index] = False
+    compiled = CompiledTree(header, values, target_index)
+    report = []
+    subtrees = SubtreePool(jobs, len(data)) if jobs else None
+    tree = grow_tree(codes, values, header, np.arange(len(data)), available, target_index, compiled, report, depth, subtrees=subtrees)
+    if subtrees is not None:
+        report = subtrees.merge(tree, compiled, report)
+    return tree, compiled.finish(), report
+
+def grow_subtree(task):
+    # gradi podstablo u procesu iz skupa; vraća stablo, zapise ispisa i liste prevedenog podstabla
+    rows, available, depth, path = task
+    codes, values, header, target = training
+    compiled = CompiledTree(header, values, target)
+    report = []
+    tree = grow_tree(codes, values, header, rows, available, target, compiled, report, depth, path)
+    return tree, report, (compiled.feature, compiled.label, compiled.offset, compiled.children)
+
+class SubtreePool:
+    # skup procesa za podstabla: podstablo s barem min_rows redaka gradi se u zasebnom procesu, a podstablo s više
+    # od max_rows redaka glavni proces dalje grana sam kako bi zadaci bili podjednaki; rezultati se spajaju redom predaje
+    def __init__(self, jobs, rows, min_rows=2000):
+        self.pool = multiprocessing.get_context("fork").Pool(jobs)
+        self.min_rows = min_rows
+        self.max_rows = max(min_rows, rows // (4 * jobs))
+        self.pending = []  # (čvor, kod vrijednosti, rječnik grana roditelja, vrijednost, rezultat)
+
+    def submit(self, node, code, branches, value, task):
+        # vraća zapis koji u ispisu označava mjesto podstabla
+        self.pending.append((node, code, branches, value, self.pool.apply_async(grow_subtree, [task])))
+        return ("subtree", len(self.pending) - 1)
+
+    def merge(self, tree, compiled, report):
+        # umeće gotova podstabla u stablo, prevedeno stablo i zapise ispisa
+        reports = []
+        for node, code, branches, value, result in self.pending:
+            subtree, subtree_report, arrays = result.get()
+            branches[value] = subtree
+            compiled.set_child(node, code, compiled.graft(arrays))
+            reports.append(subtree_report)
+        self.pool.close()
+        self.pool.join()
+        merged = []
+        for record in report:
+            if record[0] == "subtree":
+                merged.extend(reports[record[1]])
+            else:
+                merged.append(record)
+        return merged
+
+def grow_tree(codes, values, header, rows, available, target, compiled, report, depth=None, path=(), subtrees=None):
+    # zapisi ispisa dodaju se u report redom obilaska u dubinu: ("ig", dobiti) za čvor u kojem se računa dobit
+    # i ("branch", put, oznaka) za list, gdje je put niz parova (značajka, vrijednost) od korijena
+    labels = codes[rows, target]
     # provjera jesu li sve ciljne varijable iste
-    if len(set(row[target_index] for row in data)) == 1:
-        return data[0][target_index]
+    if (labels == labels[0]).all():
+        return leaf(compiled, report, values[target], int(labels[0]), path)
 
+    majority = majority_label(codes, values, rows, target)
     # provjera je li dostignuta maksimalna dubina
     if depth is not None and depth == 0:
-        return majority_vote(data, target_index)
+        return leaf(compiled, report, values[target], majority, path)
 
     # provjera je li ostala samo jedna značajka
-    if len(data[0]) == 1:
-        return majority_vote(data, target_index)
+    features = np.flatnonzero(available).tolist()
+    if not features:
+        return leaf(compiled, report, values[target], majority, path)
 
     # najbolja značajka za grananje
-    best_feature = best_feature_to_split(data, header, target_index)
+    best_feature, gains = best_feature_to_split(codes, values, rows, features, header, target)
+    report.append(("ig", gains))
     if best_feature == -1:
-        return majority_vote(data, target_index)
+        return leaf(compiled, report, values[target], majority, path)
+    node = compiled.add_node(best_feature, majority)
 
     tree = {}
-    feature_values = set(row[best_feature] for row in data)
+    column = codes[rows, best_feature]
+    present, first = np.unique(column, return_index=True)
+    # skup vrijednosti puni se redom prvog pojavljivanja, pa je poredak grana isti kao za skup vrijednosti po redcima
+    feature_values = set(values[best_feature][code] for code in present[np.argsort(first)].tolist())
     tree[header[best_feature]] = {}
+    subtree_available = available.copy()
+    subtree_available[best_feature] = False
 
     # nova podstabla za svaku vrijednost najbolje značajke
     for value in feature_values:
-        subset = [row[:best_feature] + row[best_feature+1:] for row in data if row[best_feature] == value]
-        subtree_header = header[:best_feature] + header[best_feature+1:]
-        subtree = build_tree(subset, subtree_header, target_index if best_feature > target_index else target_index - 1, depth - 1 if depth is not None else None, level + 1, f"{branch}{level}:{header[best_feature]}={value} ")
-        tree[header[best_feature]][value] = subtree
-        # grana u ispis ako je podstablo list
-        if isinstance(subtree, str):
-            branches_print += f"{branch}{level}:{header[best_feature]}={value} {subtree}\n"
+        code = values[best_feature].index(value)
+        subset = rows[column == code]  # indeksi redaka s tom vrijednošću, bez kopiranja redaka
+        subtree_depth = depth - 1 if depth is not None else None
+        subtree_path = path + ((header[best_feature], value),)
+        if subtrees is not None and subtrees.min_rows <= len(subset) <= subtrees.max_rows:
+            report.append(subtrees.submit(node, code, tree[header[best_feature]], value, (subset, subtree_available, subtree_depth, subtree_path)))
+            tree[header[best_feature]][value] = None  # mjesto za podstablo iz skupa procesa
+            continue
+        compiled.set_child(node, code, len(compiled.feature))  # dijete je sljedeći dodani čvor
+        tree[header[best_feature]][value] = grow_tree(codes, values, header, subset, subtree_available, target, compiled, report, subtree_depth, subtree_path, subtrees)
 
     return tree
 
-def majority_vote(data, target_index):
-    # broji pojavljivanja svake vrijednosti ciljne varijable
-    counts = {}
-    for row in data:
-        label = row[target_index]
-        if label not in counts:
-            counts[label] = 0
-        counts[label] += 1
-
-    # sortira prema broju pojavljivanja (silazno) i abecedno
-    items = list(counts.items())
-    items.sort(key=lambda x: x[0])  # sortira abecedno
-    items.sort(key=lambda x: x[1], reverse=True)  # sortira prema broju pojavljivanja (silazno)
-    
-    # vraća vrijednost s najviše pojavljivanja
-    return items[0][0]
+def leaf(compiled, report, labels, label, path):
+    # list s oznakom; grana u ispis ako list nije korijen
+    compiled.add_leaf(label)
+    if path:
+        report.append(("branch", path, labels[label]))
+    return labels[label]
+
+def format_report(report):
+    # tekst ispisa informacijske dobiti i grana iz zapisa
+    gains = " ".join(f"IG({name})={gain:.4f}" for record in report if record[0] == "ig" for name, gain in record[1])
+    branches = "\n".join(" ".join(f"{level}:{name}={value}" for level, (name, value) in enumerate(record[1], 1)) + f" {record[2]}"
+                         for record in report if record[0] == "branch")
+    return gains, branches
+
+def read_chunks(file, chunk_size):
+    # čita preostale redke datoteke u dijelovima od chunk_size redaka
+    while True:
+        lines = list(islice(file, chunk_size))
+        if not lines:
+            return
+        yield [line.strip().split(',') for line in lines]
+
+def encode_chunk(chunk, index):
+    # kodira dio redaka zadanim rječnicima vrijednost -> kod za svaki stupac
+    codes = np.empty((len(chunk), len(index)), dtype=np.int64)
+    for column, column_values in enumerate(zip(*chunk)):
+        present, inverse = np.unique(np.array(column_values), return_inverse=True)
+        codes[:, column] = np.array([index[column][value] for value in present.tolist()], dtype=np.int64)[inverse]
+    return codes
+
+def reduce_counts(parts):
+    # spaja dijelove (ključevi, broj pojavljivanja, prvo pojavljivanje) u jedan dio s jedinstvenim sortiranim ključevima
+    keys, inverse = np.unique(np.concatenate([part[0] for part in parts]), return_inverse=True)
+    counts = np.zeros(len(keys), dtype=np.int64)
+    np.add.at(counts, inverse, np.concatenate([part[1] for part in parts]))
+    first = np.full(len(keys), np.iinfo(np.int64).max, dtype=np.int64)
+    np.minimum.at(first, inverse, np.concatenate([part[2] for part in parts]))
+    return keys, counts, first
+
+def stream_tree(filepath, depth=None, chunk_size=10000):
+    # gradi isto stablo kao build_tree bez učitavanja cijelog skupa u memoriju: stablo raste razinu po razinu,
+    # a za svaku razinu jedan prolaz kroz datoteku skuplja tablice kontingencije (čvor, značajka, vrijednost, oznaka)
+    # s brojem pojavljivanja i rednim brojem retka prvog pojavljivanja; memorija ovisi o broju čvorova i vrijednosti
+    # prvi prolaz: vrijednosti svakog stupca, kodovi prate abecedni poredak kao u encode_data
+    with open(filepath, 'r') as file:
+        header = file.readline().strip().split(',')
+        seen = [set() for _ in header]
+        for chunk in read_chunks(file, chunk_size):
+            for column, column_values in enumerate(zip(*chunk)):
+                seen[column].update(column_values)
+    values = [sorted(column_values) for column_values in seen]
+    index = [{value: code for code, value in enumerate(column_values)} for column_values in values]
+    target = len(header) - 1
+    features = list(range(target))  # svi stupci osim ciljne varijable
+    width, max_values, num_labels = len(features) + 1, max(len(column_values) for column_values in values), len(values[target])
+    # ključ: ((čvor razine * width + položaj značajke) * max_values + vrijednost) * num_labels + oznaka,
+    # dodatni položaj značajke (uvijek vrijednost 0) daje broj pojavljivanja oznaka u čvoru
+
+    compiled = CompiledTree(header, values, target)
+    available = np.ones(len(header), dtype=bool)
+    available[target] = False
+    frontier = [(compiled.add_leaf(0), available, depth)]  # neobrađeni čvorovi trenutne razine
+    records = {}  # čvor -> (dobiti, ime značajke, [(vrijednost, dijete)])
+    while frontier:
+        level_index = np.full(len(compiled.feature), -1, dtype=np.int64)
+        level_index[[node for node, _, _ in frontier]] = np.arange(len(frontier))
+        parts, pending, row_offset = [], 0, 0
+        with open(filepath, 'r') as file:
+            file.readline()
+            for chunk in read_chunks(file, chunk_size):
+                codes = encode_chunk(chunk, index)
+                level_node = level_index[compiled.route(codes)]  # čvor razine do kojeg redak dolazi, -1 za gotove listove
+                keep = np.flatnonzero(level_node >= 0)
+                columns = np.concatenate([codes[keep][:, features], np.zeros((len(keep), 1), dtype=np.int64)], axis=1)
+                keys = (((level_node[keep][:, None] * width + np.arange(width)) * max_values + columns) * num_labels + codes[keep, target][:, None]).ravel()
+                keys, first, counts = np.unique(keys, return_index=True, return_counts=True)
+                parts.append((keys, counts, np.repeat(row_offset + keep, width)[first]))
+                pending += len(keys)
+                row_offset += len(chunk)
+                if pending > 4 * chunk_size * width:  # povremeno spajanje ograničava memoriju
+                    parts = [reduce_counts(parts)]
+                    pending = len(parts[0][0])
+        keys, counts, first = reduce_counts(parts)
+        level_node, position, value, label = np.unravel_index(keys, (len(frontier), width, max_values, num_labels))
+        bounds = np.searchsorted(level_node, np.arange(len(frontier) + 1))
+
+        next_frontier = []
+        for i, (node, node_available, node_depth) in enumerate(frontier):
+            # tablice kontingencije čvora: položaj značajke -> vrijednost -> (broj pojavljivanja oznaka, prva pojavljivanja)
+            tables = {}
+            segment = slice(bounds[i], bounds[i + 1])
+            for feature_position, code, label_code, count, first_row in zip(position[segment].tolist(), value[segment].tolist(), label[segment].tolist(), counts[segment].tolist(), first[segment].tolist()):
+                table = tables.setdefault(feature_position, {})
+                if code not in table:
+                    table[code] = ([0] * num_labels, [row_offset] * num_labels)
+                table[code][0][label_code] = count
+                table[code][1][label_code] = first_row
+            label_counts, label_first = tables[len(features)][0]
+            # provjera jesu li sve ciljne varijable iste
+            if sum(1 for count in label_counts if count) == 1:
+                compiled.label[node] = next(code for code, count in enumerate(label_counts) if count)
+                continue
+            compiled.label[node] = label_counts.index(max(label_counts))  # većinska oznaka, abecedno prva kod jednakog broja
+            node_features = np.flatnonzero(node_available).tolist()
+            if node_depth is not None and node_depth == 0 or not node_features:
+                continue
+            total = sum(label_counts)
+            total_entropy = entropy(label_counts, label_first)
+            gains = [total_entropy - conditional_entropy([(min(value_first), value_counts, value_first) for value_counts, value_first in tables[feature].values()], total) for feature in node_features]
+            best_feature, gains = choose_feature(header, node_features, gains)
+            records[node] = (gains, header[best_feature], [])
+            if best_feature == -1:
+                continue
+            compiled.split(node, best_feature)
+            child_available = node_available.copy()
+            child_available[best_feature] = False
+            # skup vrijednosti puni se redom prvog pojavljivanja, kao u build_tree
+            present = sorted(tables[best_feature].items(), key=lambda item: min(item[1][1]))
+            for feature_value in set(values[best_feature][code] for code, _ in present):
+                child = compiled.add_leaf(0)
+                compiled.set_child(node, index[best_feature][feature_value], child)
+                records[node][2].append((feature_value, child))
+                next_frontier.append((child, child_available, node_depth - 1 if node_depth is not None else None))
+        frontier = next_frontier
+
+    # zapisi ispisa redom obilaska u dubinu, kao kod rekurzivne izgradnje
+    report = []
+    def visit(node, path=()):
+        label = values[target][compiled.label[node]]
+        if node in records:
+            gains, name, children = records[node]
+            report.append(("ig", gains))
+            if children:
+                return {name: {feature_value: visit(child, path + ((name, feature_value),)) for feature_value, child in children}}
+        if path:
+            report.append(("branch", path, label))
+        return label
+    tree = visit(0)
+    return tree, compiled.finish(), report
+
+def majority_label(codes, values, rows, target):
+    # kod najčešće oznake među redcima; kodovi prate abecedni poredak, pa argmax kod jednakog broja daje abecedno prvu
+    return int(np.argmax(np.bincount(codes[rows, target], minlength=len(values[target]))))
+
+def evaluate_accuracy(data, compiled, header):
+    # predviđanje za sve uzorke odjednom prevedenim stablom
+    return score(data, compiled, compiled.predict(compiled.encode(header, data)))
+
+def evaluate_depths(data, compiled, header):
+    # predikcije i točnost za svako ograničenje dubine jednim obilaskom skupa za testiranje
+    return [score(data, compiled, codes) for codes in compiled.predict_depths(compiled.encode(header, data))]
+
+def score(data, compiled, codes):
+    labels = compiled.values[compiled.target]
+    predictions = [labels[code] for code in codes.tolist()]
 
-def predict(tree, sample, header, train_data, target_index):
-    # provjerava je li čvor list
-    if isinstance(tree, str):
-        return tree
-    
-    # prolaz kroz značajke u stablu
-    for feature, branches in tree.items():
-        feature_index = header.index(feature)  # indeks značajke
-        feature_value = sample[feature_index]  # vrijednost značajke iz uzorka
-
-        # provjera postoji li grana za ovu vrijednost značajke
-        if feature_value in branches:
-            # rekurzivno predviđanje koristeći podstablo
-            return predict(branches[feature_value], sample, header, train_data, target_index)
-    
-    # ako vrijednost nije pronađena u granama, vraća najčešću vrijednost ciljne varijable
-    return majority_vote(train_data, target_index)
-
-def evaluate_accuracy(data, tree, header, train_data, target_index):
-    # broji točne predikcije
-    correct = 0
-    predictions = []
-    
-    # za svaki uzorak u skupu podataka
-    for sample in data:
-        # predviđanje vrijednosti ciljne varijable za uzorak
-        predicted = predict(tree, sample, header, train_data, target_index)
-        # dodaje predikciju u listu predikcija
-        predictions.append(predicted)
-        # provjerava je li predikcija točna
-        if predicted == sample[-1]:
-            correct += 1
-    
     # izračunava točnost kao omjer točnih predikcija i ukupnog broja uzoraka
+    correct = sum(predicted == sample[-1] for predicted, sample in zip(predictions, data))
     accuracy = correct / len(data)
     return predictions, accuracy
 
 def confusion_matrix(data, predictions, header):
-    # stvarne vrijednosti ciljne varijable iz podataka
-    actual = [row[-1] for row in data]
-    # jedinstvene vrijednosti ciljne varijable, sortirane
-    unique_labels = sorted(set(actual))
-    # inicijalizira matricu zabune s nulama
-    matrix = {label: {l: 0 for l in unique_labels} for label in unique_labels}
-
-    # popunjava matricu zabune na temelju stvarnih i predviđenih vrijednosti
-    for true, pred in zip(actual, predictions):
-        matrix[true][pred] += 1
-
-    return matrix
+    # stvarne vrijednosti ciljne varijable iz podataka, jedinstvene vrijednosti sortirane
+    actual, actual_codes = np.unique(np.array([row[-1] for row in data]), return_inverse=True)
+    unique_labels = actual.tolist()
+    # predviđena oznaka koja se ne pojavljuje među stvarnima dobiva vlastiti redak i stupac
+    unique_labels += sorted(set(predictions) - set(unique_labels))
+    index = {label: i for i, label in enumerate(unique_labels)}
+    predicted_codes = np.array([index[label] for label in predictions], dtype=np.int64)
+    # matrica zabune jednim prebrojavanjem parova (stvarna, predviđena)
+    counts = np.bincount(actual_codes * len(unique_labels) + predicted_codes, minlength=len(unique_labels) ** 2).reshape(len(unique_labels), -1)
+    return {label: {l: int(counts[i, j]) for j, l in enumerate(unique_labels)} for i, label in enumerate(unique_labels)}
 
 def print_confusion_matrix(matrix):
     # jedinstvene i sortirane oznake ciljne varijable
@@ -183,23 +506,27 @@ def print_confusion_matrix(matrix):
         # ispisuje brojeve iz matrice zabune za određenu oznaku
         print(" ".join(str(matrix[label][l]) for l in labels))
 
-def ID3(file1, file2, depth=None):
-    global ig_print, branches_print
+def predict(model, file2, chunk_size=10000):
+    # predikcija spremljenim modelom bez treniranja; "-" čita redke sa standardnog ulaza (prvi redak je zaglavlje)
+    # i ispisuje predikciju za svaki redak čim je njegov dio pročitan
+    compiled = CompiledTree.load(model)
+    labels = compiled.values[compiled.target]
+    if file2 == "-":
+        header = sys.stdin.readline().strip().split(',')
+        for chunk in read_chunks(sys.stdin, chunk_size):
+            print("\n".join(labels[code] for code in compiled.predict(compiled.encode(header, chunk)).tolist()), flush=True)
+        return
 
-    # učitava podatke iz datoteka za treniranje i testiranje
-    header1, data1 = read_data(file1)
     header2, data2 = read_data(file2)
+    # bez ciljnog stupca u skupu za testiranje ispisuju se samo predikcije
+    if header2[-1] != compiled.header[compiled.target]:
+        print("[PREDICTIONS]:", " ".join(labels[code] for code in compiled.predict(compiled.encode(header2, data2)).tolist()))
+        return
+    evaluate(data2, compiled, header2)
 
-    # gradi stablo odluke koristeći skup podataka za treniranje
-    tree = build_tree(data1, header1, len(header1) - 1, depth)
-    
-    # ispisuje informacije o informacijskoj dobiti i granama stabla
-    print(ig_print.strip())
-    print("[BRANCHES]:")
-    print(branches_print.strip())
-
+def evaluate(data2, compiled, header2):
     # evaluira točnost modela na skupu podataka za testiranje
-    predictions, accuracy = evaluate_accuracy(data2, tree, header2, data1, len(header1) - 1)
+    predictions, accuracy = evaluate_accuracy(data2, compiled, header2)
     print("[PREDICTIONS]:", " ".join(predictions))
     print("[ACCURACY]:", f"{accuracy:.5f}")
 
@@ -207,12 +534,56 @@ def ID3(file1, file2, depth=None):
     matrix = confusion_matrix(data2, predictions, header2)
     print_confusion_matrix(matrix)
 
+def ID3(file1, file2, depth=None, stream=False, jobs=None, sweep=False, save=None):
+    # učitava podatke iz datoteka za treniranje i testiranje
+    header2, data2 = read_data(file2)
+
+    # gradi stablo odluke koristeći skup podataka za treniranje, uz stream čitajući ga u dijelovima
+    if stream:
+        tree, compiled, report = stream_tree(file1, depth)
+    else:
+        header1, data1 = read_data(file1)
+        tree, compiled, report = build_tree(data1, header1, len(header1) - 1, depth, jobs)
+    if save is not None:
+        compiled.save(save)
+    
+    # uz sweep stablo se gradi bez ograničenja dubine jednom, a točnost i matrica zabune ispisuju se za svaku dubinu
+    if sweep:
+        for tree_depth, (predictions, accuracy) in enumerate(evaluate_depths(data2, compiled, header2)):
+            print("[DEPTH]:", tree_depth)
+            print("[ACCURACY]:", f"{accuracy:.5f}")
+            print_confusion_matrix(confusion_matrix(data2, predictions, header2))
+        return
+
+    # ispisuje informacije o informacijskoj dobiti i granama stabla
+    gains, branches = format_report(report)
+    print(gains)
+    print("[BRANCHES]:")
+    print(branches)
+    evaluate(data2, compiled, header2)
+
+def option(name, convert=str, default=None):
+    # vrijednost opcije naredbenog retka
+    return convert(sys.argv[sys.argv.index(name) + 1]) if name in sys.argv else default
+
+jobs = option("--jobs", int)  # broj procesa za gradnju podstabala
+save = option("--save")  # datoteka u koju se sprema naučeni model
+model = option("--model")  # spremljeni model za predikciju bez treniranja
+options = ("--jobs", "--save", "--model")  # opcije s vrijednošću
+args = [arg for i, arg in enumerate(sys.argv) if i > 0 and not arg.startswith("--") and sys.argv[i - 1] not in options]  # argumenti bez opcija
+if model is not None:
+    # --model M [test.csv | -]: predikcija spremljenim modelom, bez datoteke ili s "-" redci se čitaju sa standardnog ulaza
+    predict(model, args[0] if args else "-")
+    sys.exit(0)
 try:
-    file1 = sys.argv[1]  # putanja do datoteke skupa podataka za treniranje
-    file2 = sys.argv[2]  # putanja do datoteke skupa podataka za testiranje
-    depth = int(sys.argv[3]) if len(sys.argv) > 3 else None  # dubina stabla (opcionalno)
+    file1 = args[0]  # putanja do datoteke skupa podataka za treniranje
+    file2 = args[1]  # putanja do datoteke skupa podataka za testiranje
+    depth = int(args[2]) if len(args) > 2 else None  # dubina stabla (opcionalno)
 except IndexError:
     sys.exit(1)  # izlazi ako argumenti nisu ispravno dani
 
-# pokreće ID3 algoritam s danim argumentima
-ID3(file1, file2, depth)
+# pokreće ID3 algoritam s danim argumentima, --stream za treniranje bez učitavanja skupa u memoriju,
+# --jobs N za gradnju podstabala u N procesa, --sweep za procjenu svih dubina jednim treniranjem,
+# --save M za spremanje naučenog modela
+sweep = "--sweep" in sys.argv
+ID3(file1, file2, None if sweep else depth, "--stream" in sys.argv, jobs, sweep, save)
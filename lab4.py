@@ -1,19 +1,25 @@
 import numpy as np 
-import random  
 import sys 
 
 class Population:
-    def __init__(self, input_len, nn):
-        self.layers = [input_len] + nn + [1]  # slojevi neuronske mreže
-        # težine - normalna distribucija
-        self.weights = []
-        for i in range(len(self.layers) - 1):
-            self.weights.append(np.random.normal(0, 0.01, size=(self.layers[i+1], self.layers[i])))
-        # pristranosti - normalna distribucija
-        self.biases = []
-        for i in range(len(self.layers) - 1):
-            self.biases.append(np.random.normal(0, 0.01, size=(self.layers[i+1])))
-        self.diff_squared = float('inf')  # početna kvadratna razlika - beskonačnost
+    # cijela populacija u složenim tenzorima: weights[i] je (popsize, izlaz, ulaz), biases[i] je (popsize, izlaz)
+    # za i-ti sloj, a diff_squared[j] srednja kvadratna razlika j-te jedinke
+    def __init__(self, weights, biases, diff_squared):
+        self.weights = weights
+        self.biases = biases
+        self.diff_squared = diff_squared
+
+    @staticmethod
+    def random(input_len, nn, popsize):
+        layers = [input_len] + nn + [1]  # slojevi neuronske mreže
+        # težine i pristranosti - normalna distribucija, početna kvadratna razlika - beskonačnost
+        weights = [np.random.normal(0, 0.01, size=(popsize, layers[i+1], layers[i])) for i in range(len(layers) - 1)]
+        biases = [np.random.normal(0, 0.01, size=(popsize, layers[i+1])) for i in range(len(layers) - 1)]
+        return Population(weights, biases, np.full(popsize, np.inf))
+
+    def take(self, individuals):
+        # jedinke s danim indeksima kao nova populacija
+        return Population([w[individuals] for w in self.weights], [b[individuals] for b in self.biases], self.diff_squared[individuals])
 
 def read_from_file(path):
     with open(path, 'r', encoding='utf-8') as file:
@@ -28,67 +34,81 @@ def sigmoid(x):
     return 1 / (1 + np.exp(-x))  # sigmoidna funkcija
 
 def forward(x, weights, biases):
+    # x je matrica ulaza (jedan primjer po retku), izlaz je (jedinka, primjer, izlaz) za sve jedinke i primjere odjednom
     for w, b in zip(weights[:-1], biases[:-1]):  # kroz sve slojeve osim izlaznog
-        x = sigmoid(np.dot(w, x) + b)  # izlaz trenutnog sloja
-    return np.dot(weights[-1], x) + biases[-1]  # izlaz mreže
-
-def propagate(data, populations):
-    for pop in populations:  # kroz svaku populaciju
-        dif_squared = 0  # kvadratna razlika na nulu
-        for row in data:  # kroz svaki red u podacima
-            x = np.array(row[:-1], dtype=np.float64)  # ulazni podatci
-            y = float(row[-1])  # ciljna vrijednost
-            prediction = forward(x, pop.weights, pop.biases)  # predikcija mreže
-            dif_squared += (y - prediction) ** 2  # kvadratna razlika
-        pop.diff_squared = dif_squared / len(data)  # srednja kvadratna razlika
+        x = sigmoid(x @ w.transpose(0, 2, 1) + b[:, None, :])  # izlaz trenutnog sloja
+    return x @ weights[-1].transpose(0, 2, 1) + biases[-1][:, None, :]  # izlaz mreže
+
+def propagate(data, population, block_size=2 ** 22):
+    x = data[:, :-1]  # ulazni podatci
+    y = data[:, -1]  # ciljne vrijednosti
+    # jedinke se obrađuju u blokovima da međurezultati (jedinka, primjer, neuron) ne prelaze block_size brojeva
+    width = max(w.shape[1] for w in population.weights)
+    block = max(1, block_size // (len(data) * width))
+    for start in range(0, len(population.diff_squared), block):
+        individuals = slice(start, start + block)
+        prediction = forward(x, [w[individuals] for w in population.weights], [b[individuals] for b in population.biases])[:, :, 0]  # predikcija mreže
+        population.diff_squared[individuals] = np.mean((y - prediction) ** 2, axis=1)  # srednja kvadratna razlika
+
+def crossover(ranked, parent1, parent2, elitism):
+    # aritmetičko križanje (prosjek roditelja) za sve djecu odjednom; ranked je populacija sortirana po grešci.
+    # drugi roditelj i-tog djeteta bira se iz sortirane populacije, elite i prethodno stvorene djece, redom indeksa
+    # (ranked, elite ranked[:elitism], djeca), pa se dijete čiji je roditelj drugo dijete računa u kasnijem valu
+    popsize = len(ranked.diff_squared)
+    from_child = parent2 >= popsize + elitism
+    second = np.where(parent2 < popsize, parent2, parent2 - popsize)  # indeks u ranked za roditelja koji nije dijete
+    second_child = np.where(from_child, parent2 - popsize - elitism, 0)  # indeks djeteta roditelja
+    weights = [np.empty((len(parent1),) + w.shape[1:]) for w in ranked.weights]
+    biases = [np.empty((len(parent1),) + b.shape[1:]) for b in ranked.biases]
+    done = np.zeros(len(parent1), dtype=bool)
+    while not done.all():
+        ready = ~done & (~from_child | done[second_child])  # djeca čiji su roditelji poznati
+        old, new = ready & ~from_child, ready & from_child
+        for children, source in ((weights, ranked.weights), (biases, ranked.biases)):
+            for child, layer in zip(children, source):
+                child[old] = (layer[parent1[old]] + layer[second[old]]) / 2
+                child[new] = (layer[parent1[new]] + child[second_child[new]]) / 2
+        done |= ready
+    return weights, biases
+
+def mutate(population, p, k):
+    # gaussova mutacija: svaki sloj svake jedinke s vjerojatnošću p dobiva šum N(0, k) na težine i pristranosti
+    mutated = np.random.random((len(population.diff_squared), len(population.weights))) < p
+    for i, (w, b) in enumerate(zip(population.weights, population.biases)):
+        individuals = mutated[:, i]
+        w[individuals] += np.random.normal(0, k, size=(individuals.sum(),) + w.shape[1:])
+        b[individuals] += np.random.normal(0, k, size=(individuals.sum(),) + b.shape[1:])
 
 
 def create_matrix(file_name):
     lines = read_from_file(file_name)[1:]  # bez zaglavlja
-    matrix = []
-    for line in lines:
-        matrix.append(list(map(float, line)))
-    return matrix  
+    return np.array(lines, dtype=np.float64)  # matrica primjera, pretvara se jednom za sve generacije
 
 def train(train_data, test_data, nn, popsize, elitism, p, k, iterations):
     input_len = len(train_data[0]) - 1  
-    populations = []  # inicijalizacija populacije
-    for _ in range(popsize):
-        populations.append(Population(input_len, nn))
+    population = Population.random(input_len, nn, popsize)  # inicijalizacija populacije
+    children = popsize - elitism  # broj djece u svakoj generaciji
 
     for iteration in range(iterations):  # kroz broj iteracija
-        propagate(train_data, populations)  # Propagacija - trening podatci
-        sorted_population = sorted(populations, key=lambda x: x.diff_squared)  # sortiranje populacije po kvadratnoj razlici
-        next_generation = sorted_population[:elitism]  # najbolji
+        propagate(train_data, population)  # Propagacija - trening podatci
+        ranked = population.take(np.argsort(population.diff_squared, kind="stable"))  # sortiranje populacije po kvadratnoj razlici
 
         if iteration % 2000 == 1999:  # greška svakih 2000 iteracija
-            print(f"[Train error @{iteration+1}]: {float(next_generation[0].diff_squared)}")
-
-        while len(next_generation) < popsize:  # nova populacija
-            parent1 = random.sample(sorted_population, 1)[0]
-            parent2 = random.sample(sorted_population + next_generation, 1)[0]
-            child_weights = []
-            for w1, w2 in zip(parent1.weights, parent2.weights):
-                child_weights.append((w1 + w2) / 2)
-            child_biases = []
-            for b1, b2 in zip(parent1.biases, parent2.biases):
-                child_biases.append((b1 + b2) / 2)
-            child = Population(input_len, nn)
-            child.weights= child_weights
-            child.biases = child_biases
-            next_generation.append(child)
-
-        for individual in next_generation:  # mutacija jedinki
-            for i in range(len(individual.weights)):
-                if random.random() < p:
-                    individual.weights[i] += np.random.normal(0, k, size=individual.weights[i].shape)
-                    individual.biases[i] += np.random.normal(0, k, size=individual.biases[i].shape)
-
-        populations = next_generation  # nova generacija kao trenutna
-
-    best_individual = min(populations, key=lambda x: x.diff_squared)  # najbolja jedinka
-    propagate(test_data, [best_individual])  # propagacija - testni podatci
-    print(f"[Test error]: {float(best_individual.diff_squared)}")  # greška
+            print(f"[Train error @{iteration+1}]: {float(ranked.diff_squared[0])}")
+
+        # selekcija: prvi roditelj iz populacije, drugi iz populacije, elite i do tada stvorene djece
+        parent1 = np.random.randint(popsize, size=children)
+        parent2 = np.random.randint(popsize + elitism + np.arange(children))
+        weights, biases = crossover(ranked, parent1, parent2, elitism)
+        # nova populacija: najbolji i djeca (djeca još nemaju izračunatu grešku)
+        population = Population([np.concatenate([w[:elitism], c]) for w, c in zip(ranked.weights, weights)],
+                                [np.concatenate([b[:elitism], c]) for b, c in zip(ranked.biases, biases)],
+                                np.concatenate([ranked.diff_squared[:elitism], np.full(children, np.inf)]))
+        mutate(population, p, k)  # mutacija jedinki
+
+    best_individual = population.take([np.argmin(population.diff_squared)])  # najbolja jedinka
+    propagate(test_data, best_individual)  # propagacija - testni podatci
+    print(f"[Test error]: {float(best_individual.diff_squared[0])}")  # greška
 
 args = sys.argv
 